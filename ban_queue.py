@@ -0,0 +1,61 @@
+import asyncio
+
+
+class BanJob:
+    """A ban that won its chance roll and is waiting for the server's executor"""
+    __slots__ = ('ctx', 'target')
+
+    def __init__(self, ctx, target):
+        self.ctx = ctx  # command context, for reporting the result back
+        self.target = target  # discord.Member to ban
+
+
+class BanExecutor:
+    """Per-server queue applying bans in order, one at a time, with a fixed interval between applied bans"""
+
+    def __init__(self, execute, get_interval):
+        self.execute = execute  # async job -> bool, whether a ban was actually applied
+        self.get_interval = get_interval  # guild_id -> seconds, read on every ban so interval changes apply immediately
+        self.queues = {}  # {guild_id: asyncio.Queue of BanJob}
+        self.workers = {}  # {guild_id: asyncio.Task}
+
+    def enqueue(self, guild_id: int, job: BanJob) -> int:
+        """Queue a ban for a server, returns how many bans are ahead of it"""
+        queue = self.queues.setdefault(guild_id, asyncio.Queue())
+        ahead = queue.qsize()
+        queue.put_nowait(job)
+
+        worker = self.workers.get(guild_id)
+        if worker is None or worker.done():
+            self.workers[guild_id] = asyncio.create_task(self.drain(guild_id, queue))
+        else:
+            ahead += 1  # the worker is busy with one already
+        return ahead
+
+    async def drain(self, guild_id: int, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return  # enqueue starts a new worker for the next ban
+
+            try:
+                applied = await self.execute(job)
+            except Exception as e:
+                print(f"❌ [CONSOLE] Ban executor error in guild {guild_id}: {e}")
+                applied = False
+
+            interval = self.get_interval(guild_id)
+            if applied and interval > 0:
+                await asyncio.sleep(interval)
+
+    def cancel(self, guild_id: int) -> None:
+        """Drop every queued ban for a server, e.g. because its game was reset"""
+        worker = self.workers.pop(guild_id, None)
+        if worker is not None:
+            worker.cancel()
+        self.queues.pop(guild_id, None)
+
+    def close(self) -> None:
+        for guild_id in list(self.workers):
+            self.cancel(guild_id)
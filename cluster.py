@@ -0,0 +1,211 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+
+from dotenv import load_dotenv
+
+
+def shard_ranges(shard_count: int, clusters: int) -> list[list[int]]:
+    """Split shard IDs 0..shard_count-1 into contiguous, evenly sized ranges, one per cluster"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges = []
+    start = 0
+    for cluster_id in range(clusters):
+        end = start + size + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def migrate_legacy_store() -> None:
+    """Split the original single tracking file into the shared store once, before any worker opens it"""
+    legacy_path = os.getenv('LEGACY_FILE', 'event_banned_users.json') or None
+    if os.getenv('STORAGE_BACKEND', 'json').lower() == 'sqlite':
+        from storage import SqliteBanStore
+        SqliteBanStore(os.getenv('SQLITE_PATH', 'event_banned_users.db'), legacy_path=legacy_path).close()
+        return
+    from storage import JsonBanStore
+    JsonBanStore(os.getenv('DATA_DIR', 'event_banned_users'), legacy_path=legacy_path).close()
+
+
+class HealthReporter:
+    """Runs inside a worker: puts a heartbeat with the shards' state on the supervisor's queue every interval"""
+
+    def __init__(self, cluster_id: int, reports: multiprocessing.Queue, interval: float = 15.0):
+        self.cluster_id = cluster_id
+        self.reports = reports
+        self.interval = interval
+        self.task = None
+
+    def start(self, bot) -> None:
+        self.task = asyncio.create_task(self.run(bot))
+
+    async def run(self, bot) -> None:
+        while True:
+            try:
+                self.reports.put_nowait(self.snapshot(bot))
+            except queue.Full:
+                pass  # the supervisor is behind, the next heartbeat will do
+            await asyncio.sleep(self.interval)
+
+    def snapshot(self, bot) -> dict:
+        main = bot.get_cog('Main')
+        return {
+            'cluster': self.cluster_id,
+            'pid': os.getpid(),
+            'ready': bot.is_ready(),
+            'guilds': len(bot.guilds),
+            'latencies': {shard_id: latency for shard_id, latency in getattr(bot, 'latencies', [])},
+            'games': main.games.active_count() if main else 0,
+            'unban_jobs': len(main.unban_jobs) if main else 0
+        }
+
+
+def run_worker(cluster_id: int, shard_ids: list[int], shard_count: int, reports: multiprocessing.Queue,
+               heartbeat_interval: float) -> None:
+    """Worker process entry point: configure sharding, then run the bot"""
+    os.environ['LEGACY_FILE'] = ''  # migrated by the supervisor, workers only ever see the shared store
+    os.environ['SHARDED'] = 'true'
+    os.environ['SHARD_COUNT'] = str(shard_count)
+    os.environ['SHARD_IDS'] = ",".join(map(str, shard_ids))
+
+    # Imported only now, CONFIG and the bot are built from the environment at import time
+    import main
+    main.bot.health_reporter = HealthReporter(cluster_id, reports, heartbeat_interval)
+    print(f"🧩 [CONSOLE] Cluster {cluster_id} starting with shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+    main.run()
+
+
+class Worker:
+    """Supervisor side of one cluster"""
+    __slots__ = ('cluster_id', 'shard_ids', 'process', 'started_at', 'last_seen', 'last_report', 'crashes',
+                 'restart_at')
+
+    def __init__(self, cluster_id: int, shard_ids: list[int]):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started_at = 0.0
+        self.last_seen = 0.0  # monotonic time of the last heartbeat (or of the start)
+        self.last_report = None
+        self.crashes = 0  # consecutive short-lived runs, for restart backoff
+        self.restart_at = 0.0
+
+
+class Supervisor:
+    """Starts one worker process per shard range, restarts workers that exit or stop sending heartbeats, and
+    logs the health of the whole cluster"""
+
+    def __init__(self, shard_count: int, clusters: int, heartbeat_interval: float = 15.0,
+                 heartbeat_timeout: float = 90.0, status_interval: float = 60.0, stop_timeout: float = 30.0):
+        self.shard_count = shard_count
+        self.stop_timeout = stop_timeout  # how long a worker gets to flush and disconnect after SIGTERM
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.status_interval = status_interval
+        self.context = multiprocessing.get_context('spawn')
+        self.reports = self.context.Queue(maxsize=1000)
+        self.workers = [Worker(cluster_id, shard_ids)
+                        for cluster_id, shard_ids in enumerate(shard_ranges(shard_count, clusters))]
+
+    def start(self, worker: Worker) -> None:
+        worker.process = self.context.Process(
+            target=run_worker,
+            args=(worker.cluster_id, worker.shard_ids, self.shard_count, self.reports, self.heartbeat_interval),
+            name=f"cluster-{worker.cluster_id}",
+            daemon=False
+        )
+        worker.process.start()
+        worker.started_at = worker.last_seen = time.monotonic()
+        worker.last_report = None
+
+    def stop(self, worker: Worker) -> None:
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.terminate()  # SIGTERM: the worker closes the bot, which flushes its store
+            worker.process.join(timeout=self.stop_timeout)
+            if worker.process.is_alive():
+                print(f"⚠️ [CONSOLE] Cluster {worker.cluster_id} didn't stop within {self.stop_timeout:.0f}s, killing it")
+                worker.process.kill()
+                worker.process.join()
+
+    def schedule_restart(self, worker: Worker, reason: str) -> None:
+        # A worker that keeps dying right after start waits longer each time (up to a minute)
+        if time.monotonic() - worker.started_at < 300:
+            worker.crashes += 1
+        else:
+            worker.crashes = 0
+        delay = min(2 ** worker.crashes, 60)
+        worker.restart_at = time.monotonic() + delay
+        worker.process = None
+        print(f"⚠️ [CONSOLE] Cluster {worker.cluster_id} {reason}, restarting in {delay}s")
+
+    def check(self, worker: Worker) -> None:
+        now = time.monotonic()
+        if worker.process is None:
+            if now >= worker.restart_at:
+                self.start(worker)
+            return
+        if not worker.process.is_alive():
+            self.schedule_restart(worker, f"exited with code {worker.process.exitcode}")
+        elif now - worker.last_seen > self.heartbeat_timeout:
+            self.stop(worker)
+            self.schedule_restart(worker, f"sent no heartbeat for {now - worker.last_seen:.0f}s")
+
+    def receive(self, timeout: float) -> None:
+        try:
+            report = self.reports.get(timeout=timeout)
+        except queue.Empty:
+            return
+        worker = self.workers[report['cluster']]
+        if worker.process is not None and report['pid'] == worker.process.pid:
+            worker.last_seen = time.monotonic()
+            worker.last_report = report
+
+    def log_status(self) -> None:
+        for worker in self.workers:
+            report = worker.last_report
+            shards = f"shards {worker.shard_ids[0]}-{worker.shard_ids[-1]}"
+            if report is None:
+                print(f"🩺 [CONSOLE] Cluster {worker.cluster_id} ({shards}): starting")
+                continue
+            latencies = [latency for latency in report['latencies'].values() if latency == latency]  # skip NaN
+            latency = f"{max(latencies) * 1000:.0f}ms" if latencies else "n/a"
+            print(f"🩺 [CONSOLE] Cluster {worker.cluster_id} ({shards}): {'ready' if report['ready'] else 'connecting'}, "
+                  f"{report['guilds']} guilds, {report['games']} active games, {report['unban_jobs']} unban jobs, "
+                  f"max latency {latency}")
+
+    def run(self) -> None:
+        for worker in self.workers:
+            self.start(worker)
+        print(f"🧩 [CONSOLE] Supervisor started {len(self.workers)} clusters for {self.shard_count} shards")
+
+        next_status = time.monotonic() + self.status_interval
+        try:
+            while True:
+                self.receive(timeout=1.0)
+                for worker in self.workers:
+                    self.check(worker)
+                if time.monotonic() >= next_status:
+                    self.log_status()
+                    next_status = time.monotonic() + self.status_interval
+        except KeyboardInterrupt:
+            print("🛑 [CONSOLE] Stopping clusters...")
+        finally:
+            for worker in self.workers:
+                self.stop(worker)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    migrate_legacy_store()
+    clusters = int(os.getenv('CLUSTER_COUNT', '0')) or os.cpu_count() or 1
+    shard_count = int(os.getenv('SHARD_COUNT', '0')) or clusters
+    Supervisor(
+        shard_count,
+        clusters,
+        heartbeat_interval=float(os.getenv('HEARTBEAT_INTERVAL', '15')),
+        heartbeat_timeout=float(os.getenv('HEARTBEAT_TIMEOUT', '90'))
+    ).run()
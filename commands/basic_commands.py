@@ -1,9 +1,38 @@
 import discord
 import random
 import asyncio
+import traceback
+from discord import app_commands
 from discord.ext import commands
 
 from main import Main
+from outbound import Priority
+from retry import CircuitOpen
+from storage import ban_reason
+
+class BanRateLimited(commands.CheckFailure):
+    """Raised by the !ban rate limit check, swallowed by the command's error handler"""
+
+
+def ban_rate_limit():
+    """Command check rejecting !ban spam before the command does any work"""
+    async def predicate(ctx: commands.Context) -> bool:
+        main = ctx.bot.get_cog('Main')
+        if main is None:
+            return True
+        allowed, notify = main.ban_limiter.check(ctx.author.id)
+        if allowed:
+            return True
+        if ctx.interaction is not None:
+            # An interaction must always be answered or the user sees "The application did not respond",
+            # the ephemeral reply only reaches them so it costs nothing in the channel
+            await ctx.send("⏳ Slow down! You're banning too fast.", ephemeral=True)
+        elif notify:
+            # One reaction per limited window, every other rejected attempt is dropped silently
+            main.outbound.react(ctx.message, "⏳", priority=Priority.FAILED)
+        raise BanRateLimited()
+    return commands.check(predicate)
+
 
 class BasicCommands(commands.Cog):
     """Basic Ban Royale commands (enable, disable, ban, etc.)"""
@@ -29,7 +58,8 @@ class BasicCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
-        if main.enabled:
+        game = main.games.get(ctx.guild.id)
+        if game.enabled:
             return await ctx.send(f"{ctx.author.mention}, Ban Royale is already enabled!")
         
         allowed_mentions = discord.AllowedMentions(everyone=True)
@@ -55,30 +85,14 @@ class BasicCommands(commands.Cog):
         
         await countdown_msg.edit(content="@everyone 🔥 **GO! BAN ROYALE IS LIVE!** 🔥")
         
-        # Enable the bot
-        main.enabled = True
-        # Reset ban counts for new game
-        main.session_ban_counts.clear()
+        # Build the participant sets (in large guild mode this is when the member list gets chunked)
+        participants = await main.load_participants(ctx.guild)
         
         # Record initial participants (who was here when game started)
-        initial_members = set()
-        bot_master_role_id = main.config['bot_master']
-        bot_member = ctx.guild.get_member(self.bot.user.id)
-        bot_top_role_position = bot_member.top_role.position if bot_member else 0
-        
-        for member in ctx.guild.members:
-            # Skip bots
-            if member.bot:
-                continue
-            # Skip users with bot master role
-            if any(role.id == bot_master_role_id for role in member.roles):
-                continue
-            # Skip users with roles above the bot
-            if member.top_role.position >= bot_top_role_position:
-                continue
-            initial_members.add(member.id)
+        initial_members = participants.eligible.copy()
         
-        main.initial_participants[ctx.guild.id] = initial_members
+        # Enable the game in this server, resetting its ban counts
+        game.start(initial_members)
         
         # Console log
         print(f"🚀 [CONSOLE] Ban Royale ENABLED in {ctx.guild.name} by {ctx.author.name} - {len(initial_members)} initial participants")
@@ -97,111 +111,94 @@ class BasicCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
-        if not main.enabled:
+        game = main.games.get(ctx.guild.id)
+        if not game.enabled:
             return await ctx.send(f"{ctx.author.mention}, Ban Royale is already disabled!")
         
-        main.enabled = False
+        game.enabled = False
         print(f"🔴 [CONSOLE] Ban Royale DISABLED in {ctx.guild.name} by {ctx.author.name}")
         await ctx.send(f"Ban Royale has been **disabled**!")
 
-    @commands.command(name="ban", aliases=['b'])
-    async def _ban(self, ctx: commands.Context, *, user: discord.Member = None):
+    async def ban_reply(self, ctx: commands.Context, main: 'Main', content: str, ephemeral: bool = True) -> None:
+        """Answer a /ban interaction directly, or queue a low priority reply to a !ban message"""
+        if ctx.interaction is not None:
+            await ctx.send(content, ephemeral=ephemeral)
+        else:
+            main.reply(ctx, content)
+
+    @commands.hybrid_command(name="ban", aliases=['b'])
+    @app_commands.describe(user="The player to ban")
+    @ban_rate_limit()
+    async def _ban(self, ctx: commands.Context, *, user: str = None):
         """Ban a user with a chance of failure"""
         main = self.get_main_cog()
         if not main:
             return await ctx.send("Error: Main cog not found!")
         
         # Check if Ban Royale is enabled
-        if not main.enabled:
-            return await ctx.send(f"{ctx.author.mention}, Ban Royale is currently disabled!")
+        if ctx.guild and not main.games.is_enabled(ctx.guild.id):
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, Ban Royale is currently disabled!")
         
         if not user: 
-            return await ctx.send(f"{ctx.author.mention}, I need someone to ban.")
-        
-        if ctx.channel.id != main.config['ban_channel']: 
-            return await ctx.send(f"{ctx.author.mention}, You can't ban in this channel!")
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, I need someone to ban.")
         
         if not ctx.guild: 
             return await ctx.send("You can't ban people in DMs.")
         
-        try: 
-            user = await commands.MemberConverter().convert(ctx, user)
-        except commands.BadArgument: 
-            return await ctx.send(f"{ctx.author.mention}, I can't find that user!")
+        if ctx.channel.id != main.setting(ctx.guild.id, 'ban_channel'): 
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, You can't ban in this channel!")
+        
+        user = await main.resolve_target(ctx, user)
+        if user is None: 
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, I can't find that user!")
+        
+        # Both members were just resolved with their current roles
+        main.refresh_member(ctx.author)
+        main.refresh_member(user)
 
         if user.id == ctx.author.id: 
-            return await ctx.send(f"{ctx.author.mention}, You can't ban yourself.")
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, You can't ban yourself.")
 
         # Allow users without roles (only @everyone) to ban anyone
         # Only apply role hierarchy check if the author has roles above @everyone
         if ctx.author.top_role.position > 0 and ctx.author.top_role.position <= user.top_role.position:
-            return await ctx.send(f"{ctx.author.mention}, You can't ban that person!")
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, You can't ban that person!")
         
         # Check if user has spectator role (mid-game joiner)
-        spectator_role_name = main.config['spectator_role']
-        for role in ctx.author.roles:
-            if role.name == spectator_role_name:
-                return await ctx.send(f"{ctx.author.mention}, Spectators cannot use ban commands! You joined mid-game.")
+        if main.is_spectator(ctx.author):
+            return await self.ban_reply(ctx, main, f"{ctx.author.mention}, Spectators cannot use ban commands! You joined mid-game.")
 
         current_chance = main.get_current_ban_chance(ctx.guild)
         if random.random() < current_chance:
-            retry_count = 0
-            max_retries = 3
-            success = False
-            
-            while retry_count < max_retries and not success:
-                try: 
-                    await user.ban(reason=f"Ban Royale: Banned by {ctx.author.name}", delete_message_seconds=1)
-                    # Track the banned user
-                    main.save_banned_user(ctx.guild.id, user.id, user.name, ctx.author.name)
-                    success = True
-                except discord.Forbidden: 
-                    return await ctx.send(f"{ctx.author.mention}, Can't ban this user! (insufficient permissions)")
-                except discord.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        retry_count += 1
-                        if retry_count < max_retries:
-                            wait_time = min(retry_count * 5, 30)  # Progressive backoff
-                            await asyncio.sleep(wait_time)
-                        else:
-                            return await ctx.send(f"{ctx.author.mention}, Failed to ban after multiple rate limit retries. Please try again later.")
-                    else:
-                        return await ctx.send(f"Failed to ban user: {e}")
-            
-            if success:
-                await ctx.message.add_reaction(main.config['react_emoji'])
-                
-                # Update session ban count
-                user_id = str(ctx.author.id)
-                if user_id not in main.session_ban_counts:
-                    main.session_ban_counts[user_id] = 0
-                main.session_ban_counts[user_id] += 1
-                ban_count = main.session_ban_counts[user_id]
-                
-                # Send message to ban channel with ban count
-                ban_channel = self.bot.get_channel(main.config['ban_channel'])
-                if ban_channel:
-                    await ban_channel.send(f"{ctx.author.mention} banned {user.mention}! **({ban_count})**")
-                
-                # Send log to logs channel
-                log_channel = self.bot.get_channel(main.config['ban_logs'])
-                if log_channel:
-                    await log_channel.send(f"{ctx.author.mention} banned {user.mention}! ({ban_count})")
-                
-                # Check and log decay checkpoints if in decay mode
-                await main.check_and_log_checkpoints(ctx.guild)
-                
-                # Check win condition and end game if met
-                game_ended = await main.check_win_condition(ctx.guild)
-                if game_ended:
-                    return  # Game ended, no need for delay
-                
-                # Add configurable delay after successful ban
-                if main.config['ban_delay'] > 0:
-                    await asyncio.sleep(main.config['ban_delay'])
+            # Applied and announced by the server's ban executor, in order and at the configured ban delay
+            main.games.get(ctx.guild.id).record_hit(ctx.author.id)
+            ahead = main.enqueue_ban(ctx, user)
+            if ctx.interaction is not None:
+                position = f" behind {ahead} other ban{'s' if ahead != 1 else ''}" if ahead else ""
+                await ctx.send(f"🎯 Your ban against **{user.name}** went through the roll and is queued{position}!", ephemeral=True)
+            return
+
+        main.games.get(ctx.guild.id).record_miss(ctx.author.id)
+        await self.ban_reply(ctx, main, f"{ctx.author.mention}, your attempted ban against **{user.name}** failed! (lol)", ephemeral=False)
+
+    @_ban.error
+    async def _ban_error(self, ctx: commands.Context, error: commands.CommandError):
+        if isinstance(error, BanRateLimited):
             return
+        # Having an error handler turns off the default logging, so keep printing everything else
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    @_ban.autocomplete('user')
+    async def _ban_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        """Offer only players that are still in the game"""
+        main = self.get_main_cog()
+        if not main or not interaction.guild or not main.games.is_enabled(interaction.guild.id):
+            return []
+        return [
+            app_commands.Choice(name=name[:100], value=str(user_id))
+            for user_id, name in main.complete_targets(interaction.guild, current)
+        ]
 
-        await ctx.send(f"{ctx.author.mention}, your attempted ban against **{user.name}** failed! (lol)")
 
     @commands.command(name="banchance", aliases=['bc'])
     async def _banchance(self, ctx: commands.Context):
@@ -231,7 +228,7 @@ class BasicCommands(commands.Cog):
         except ValueError:
             return await ctx.send(f"{ctx.author.mention}, Please enter a valid number between **0.01** and **100**!")
         
-        main.config['ban_chance'] = chance
+        main.games.set(ctx.guild.id, 'ban_chance', chance)
         await ctx.send(f"Ban chance has been set to **{chance*100}%**!")
 
     @commands.command(name="bandelay", aliases=['bd'])
@@ -259,12 +256,31 @@ class BasicCommands(commands.Cog):
         if delay > 60:
             return await ctx.send(f"{ctx.author.mention}, Maximum ban delay is **60 seconds**!")
         
-        main.config['ban_delay'] = delay
+        main.games.set(ctx.guild.id, 'ban_delay', delay)
         if delay == 0:
             await ctx.send(f"Ban delay has been **disabled**!")
         else:
             await ctx.send(f"Ban delay has been set to **{delay} seconds**!")
 
+    @commands.command(name="setchannel", aliases=['sc'])
+    async def _setchannel(self, ctx: commands.Context, kind: str = None, channel: discord.TextChannel = None):
+        """Set the channel this server plays in (ban) or logs to (logs)"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        # need to be a bot master to use this command
+        if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
+            return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
+        
+        settings = {'ban': 'ban_channel', 'logs': 'ban_logs'}
+        if kind is None or kind.lower() not in settings:
+            return await ctx.send(f"{ctx.author.mention}, Usage: `!setchannel <ban|logs> [#channel]`")
+        
+        channel = channel or ctx.channel
+        main.games.set(ctx.guild.id, settings[kind.lower()], channel.id)
+        await ctx.send(f"The {kind.lower()} channel has been set to {channel.mention}!")
+
     @commands.command(name="help", aliases=['h', 'commands'])
     async def _help(self, ctx: commands.Context):
         """Display all available commands"""
@@ -278,10 +294,13 @@ class BasicCommands(commands.Cog):
         basic_commands = [
             "`!enable` or `!start` - Enable the bot royale functionality with countdown (Bot Master only)",
             "`!disable` - Disable the bot royale functionality (Bot Master only)",
-            "`!ban <user>` or `!b <user>` - Attempt to ban a user with a configurable chance",
+            "`!ban <user>` or `!b <user>` or `/ban` - Attempt to ban a user with a configurable chance",
             "`!banchance <percentage>` or `!bc <percentage>` - Set the ban success chance (Bot Master only)",
             "`!bandelay <seconds>` or `!bd <seconds>` - Set delay between ban operations (0-60 seconds, Bot Master only)",
+            "`!setchannel <ban|logs> [#channel]` or `!sc` - Set this server's ban or logs channel, the current one if none is given (Bot Master only)",
             "`!config` or `!cfg` - Display current bot configuration in an embed (Bot Master only)",
+            "`!sync` - Register the slash commands with Discord after they changed (Bot Master only)",
+            "`!suddendeath <count|percent%>` or `!sd` - Instantly ban a random share of the remaining players (Bot Master only)",
             "`!endgame` or `!eg` - End the current game, disable bot, unban all participants, and reset state (Bot Master only)"
         ]
         embed.add_field(
@@ -304,7 +323,9 @@ class BasicCommands(commands.Cog):
         
         # Unban Commands
         unban_commands = [
-            "`!unbanall` or `!ua` - Unban all users who were banned during the event (Bot Master only)"
+            "`!unbanall` or `!ua` - Unban all users who were banned during the event (Bot Master only)",
+            "`!unbanstatus` or `!us` - Show progress, throughput and ETA of the running mass unban (Bot Master only)",
+            "`!reconcile [fix]` or `!rc` - Compare tracked bans with the server's ban list, `fix` corrects the tracking (Bot Master only)"
         ]
         embed.add_field(
             name="🔓 Unban Commands",
@@ -314,7 +335,8 @@ class BasicCommands(commands.Cog):
         
         # Utility Commands
         utility_commands = [
-            "`!remaining` or `!r` - Show how many participants remain in the current game"
+            "`!remaining` or `!r` - Show how many participants remain in the current game",
+            "`!leaderboard` or `!lb` - Show the top banners, your rank and the best kill streaks"
         ]
         embed.add_field(
             name="📊 Utility Commands",
@@ -338,39 +360,43 @@ class BasicCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
+        enabled = main.games.is_enabled(ctx.guild.id)
+        decay_mode = main.setting(ctx.guild.id, 'decay_mode')
         embed = discord.Embed(
             title="🤖 Ban Royale Configuration",
-            color=0x00ff00 if main.enabled else 0xff0000,
+            color=0x00ff00 if enabled else 0xff0000,
             timestamp=discord.utils.utcnow()
         )
         
         # Status
-        status = "🟢 Enabled" if main.enabled else "🔴 Disabled"
+        status = "🟢 Enabled" if enabled else "🔴 Disabled"
         embed.add_field(name="Status", value=status, inline=True)
         
         # Ban settings
-        if main.config['decay_mode']:
+        if decay_mode:
+            await main.ensure_participants(ctx.guild)
             current_chance = main.get_current_ban_chance(ctx.guild)
             embed.add_field(name="Current Ban Chance (Decay)", value=f"{current_chance*100:.1f}%", inline=True)
         else:
-            embed.add_field(name="Ban Chance (Static)", value=f"{main.config['ban_chance']*100:.1f}%", inline=True)
+            embed.add_field(name="Ban Chance (Static)", value=f"{main.setting(ctx.guild.id, 'ban_chance')*100:.1f}%", inline=True)
         
-        embed.add_field(name="Ban Delay", value=f"{main.config['ban_delay']:.1f}s", inline=True)
+        embed.add_field(name="Ban Delay", value=f"{main.setting(ctx.guild.id, 'ban_delay'):.1f}s", inline=True)
         
         # Member count (always show)
-        effective_count = main.get_effective_member_count(ctx.guild)
-        banned_count = len(main.load_banned_users(ctx.guild.id))
+        snapshot = await main.get_progress(ctx.guild)
+        effective_count = snapshot.effective_count
+        banned_count = snapshot.banned_count
         embed.add_field(name="Members", value=f"{effective_count} (excl. bots/masters)", inline=True)
         embed.add_field(name="Progress", value=f"{banned_count}/{effective_count} banned", inline=True)
         
         # Decay mode settings
-        decay_status = "🟢 Enabled" if main.config['decay_mode'] else "🔴 Disabled"
+        decay_status = "🟢 Enabled" if decay_mode else "🔴 Disabled"
         embed.add_field(name="Decay Mode", value=decay_status, inline=True)
         
-        if main.config['decay_mode']:
+        if decay_mode:
             logged_checkpoints = main.get_logged_checkpoints(ctx.guild.id)
             
-            embed.add_field(name="Decay Range", value=f"{main.config['min_decay_chance']*100:.1f}% - {main.config['max_decay_chance']*100:.1f}%", inline=True)
+            embed.add_field(name="Decay Range", value=f"{main.setting(ctx.guild.id, 'min_decay_chance')*100:.1f}% - {main.setting(ctx.guild.id, 'max_decay_chance')*100:.1f}%", inline=True)
             
             # Show logged checkpoints
             if logged_checkpoints:
@@ -380,15 +406,15 @@ class BasicCommands(commands.Cog):
                 embed.add_field(name="Logged Checkpoints", value="None yet", inline=True)
         
         # Channel info (show clickable links)
-        ban_channel = self.bot.get_channel(main.config['ban_channel'])
+        ban_channel = self.bot.get_channel(main.setting(ctx.guild.id, 'ban_channel'))
         if ban_channel:
-            embed.add_field(name="Ban Channel", value=f"<#{main.config['ban_channel']}>", inline=True)
+            embed.add_field(name="Ban Channel", value=ban_channel.mention, inline=True)
         else:
             embed.add_field(name="Ban Channel", value="Channel not found", inline=True)
         
-        logs_channel = self.bot.get_channel(main.config['ban_logs'])
+        logs_channel = self.bot.get_channel(main.setting(ctx.guild.id, 'ban_logs'))
         if logs_channel:
-            embed.add_field(name="Logs Channel", value=f"<#{main.config['ban_logs']}>", inline=True)
+            embed.add_field(name="Logs Channel", value=logs_channel.mention, inline=True)
         else:
             embed.add_field(name="Logs Channel", value="Channel not found", inline=True)
         
@@ -396,13 +422,131 @@ class BasicCommands(commands.Cog):
         embed.add_field(name="React Emoji", value=main.config['react_emoji'], inline=True)
         
         # Server-specific stats  
-        banned_users = main.load_banned_users(ctx.guild.id)
-        embed.add_field(name="Banned Users (This Server)", value=str(len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])), inline=True)
+        embed.add_field(name="Banned Users (This Server)", value=str(banned_count), inline=True)
+        
+        # Discord API retries since startup
+        embed.add_field(name="API Retries", value=main.api.metrics.summary(), inline=False)
+        
+        # Messages shed under load since startup
+        embed.add_field(
+            name="Shed Messages",
+            value=f"{main.outbound.dropped} announcements dropped, {main.outbound.merged} merged, "
+                  f"{main.spectators.dropped_dms} welcome DMs dropped",
+            inline=False
+        )
         
         embed.set_footer(text=f"Server: {ctx.guild.name}")
         
         await ctx.send(embed=embed)
 
+    @commands.command(name="sync")
+    async def _sync(self, ctx: commands.Context):
+        """Register the slash commands with Discord, only needed when they changed"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        # need to be a bot master to use this command
+        if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
+            return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
+        
+        try:
+            synced = await self.bot.tree.sync()
+        except discord.HTTPException as e:
+            return await ctx.send(f"❌ Failed to sync slash commands: {e}")
+        print(f"Synced {len(synced)} slash commands")
+        await ctx.send(f"✅ Synced {len(synced)} slash commands")
+
+    @commands.command(name="suddendeath", aliases=['sd'])
+    async def _sudden_death(self, ctx: commands.Context, amount: str = None):
+        """Ban a random fraction or a fixed number of the remaining players in bulk"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        # need to be a bot master to use this command
+        if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
+            return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
+        
+        if not main.games.is_enabled(ctx.guild.id):
+            return await ctx.send(f"{ctx.author.mention}, Ban Royale is currently disabled!")
+        
+        remaining_ids = list(main.get_participants(ctx.guild).remaining)
+        if len(remaining_ids) < 2:
+            return await ctx.send(f"{ctx.author.mention}, There aren't enough players left for sudden death!")
+        
+        # Either a percentage of the remaining players ("25%") or a fixed count ("100")
+        try:
+            if amount.endswith('%'):
+                count = round(len(remaining_ids) * float(amount[:-1]) / 100)
+            else:
+                count = int(amount)
+        except (AttributeError, ValueError):
+            return await ctx.send(f"{ctx.author.mention}, Please enter a number of players or a percentage, e.g. `!suddendeath 25%`!")
+        
+        # Always leave at least one player standing
+        count = min(count, len(remaining_ids) - 1)
+        if count <= 0:
+            return await ctx.send(f"{ctx.author.mention}, That would not eliminate anyone!")
+        
+        victims = random.sample(remaining_ids, count)
+        print(f"☠️ [CONSOLE] Sudden death in {ctx.guild.name} by {ctx.author.name} - banning {count} of {len(remaining_ids)} players")
+        status_msg = await ctx.send(f"☠️ **SUDDEN DEATH!** Eliminating **{count}** players...")
+        
+        # Discord accepts at most 200 users per bulk ban request
+        banned_ids = []
+        failed_count = 0
+        for start in range(0, count, 200):
+            chunk = victims[start:start + 200]
+            try:
+                result = await main.api.call('bulk ban', lambda: ctx.guild.bulk_ban(
+                    [discord.Object(id=user_id) for user_id in chunk],
+                    reason=ban_reason(ctx.author.name),
+                    delete_message_seconds=0
+                ))
+            except discord.Forbidden:
+                failed_count += count - start
+                await ctx.send(f"{ctx.author.mention}, Can't bulk ban! (the bot needs Ban Members and Manage Server)")
+                break
+            except CircuitOpen:
+                failed_count += count - start
+                await ctx.send(f"{ctx.author.mention}, Discord is having trouble right now, sudden death stopped early.")
+                break
+            except (discord.RateLimited, discord.HTTPException) as e:
+                failed_count += len(chunk)
+                print(f"❌ [CONSOLE] Sudden death bulk ban failed in {ctx.guild.name}: {e}")
+                continue
+            banned_ids.extend(user.id for user in result.banned)
+            failed_count += len(result.failed)
+        
+        if banned_ids:
+            # One store write for the whole round, skipping anyone the ban queue recorded in the meantime
+            async with main.guild_lock(ctx.guild.id):
+                banned = main.get_participants(ctx.guild).banned
+                users = []
+                for user_id in banned_ids:
+                    if user_id in banned:
+                        continue
+                    member = ctx.guild.get_member(user_id)
+                    users.append((user_id, member.name if member else str(user_id)))
+                if users:
+                    main.save_banned_users(ctx.guild.id, users, ctx.author.name)
+        
+        embed = discord.Embed(
+            title="☠️ SUDDEN DEATH ☠️",
+            description=f"**{len(banned_ids)}** players were eliminated in one strike by {ctx.author.mention}!",
+            color=0x8b0000
+        )
+        embed.add_field(name="👥 Remaining", value=f"{main.get_remaining_count(ctx.guild)}", inline=True)
+        if failed_count:
+            embed.add_field(name="❌ Failed", value=f"{failed_count}", inline=True)
+        await status_msg.edit(content=None, embed=embed)
+        main.send(main.setting(ctx.guild.id, 'ban_logs'), embed=embed, priority=Priority.CHECKPOINT)
+        
+        # Checkpoints and the win condition only need checking once for the whole round
+        await main.check_and_log_checkpoints(ctx.guild)
+        await main.check_win_condition(ctx.guild)
+
     @commands.command(name="endgame", aliases=['eg'])
     async def _end_game(self, ctx: commands.Context):
         """Manually end the current game, disable bot, and unban all participants"""
@@ -414,9 +558,12 @@ class BasicCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
-        effective_count = main.get_effective_member_count(ctx.guild)
-        banned_users = main.load_banned_users(ctx.guild.id)
-        banned_count = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
+        if main.unban_job_running(ctx.guild.id):
+            return await ctx.send(f"{ctx.author.mention}, A mass unban is already running in this server! Check `!unbanstatus`")
+        
+        snapshot = await main.get_progress(ctx.guild)
+        effective_count = snapshot.effective_count
+        banned_count = snapshot.banned_count
         
         if banned_count == 0:
             embed = discord.Embed(
@@ -428,8 +575,9 @@ class BasicCommands(commands.Cog):
             return await ctx.send(embed=embed)
         
         # Check current state
-        was_decay_mode = main.config['decay_mode']
-        was_already_disabled = not main.enabled
+        game = main.games.get(ctx.guild.id)
+        was_decay_mode = main.setting(ctx.guild.id, 'decay_mode')
+        was_already_disabled = not game.enabled
         remaining_count = effective_count - banned_count
         
         # Create initial status embed
@@ -450,21 +598,25 @@ class BasicCommands(commands.Cog):
         
         # Perform mass unban only if there are users to unban
         if banned_count > 0:
-            unbanned_count, failed_count = await main.perform_mass_unban(ctx, banned_users)
+            result = await main.perform_mass_unban(ctx, main.get_banned_user_ids(ctx.guild.id))
+            if result is None:
+                return await ctx.send(f"{ctx.author.mention}, A mass unban started in the meantime, the game was left as it is. Check `!unbanstatus`")
+            unbanned_count, failed_count = result
         else:
             unbanned_count, failed_count = 0, 0
         
         # Disable the bot (if not already disabled)
         if not was_already_disabled:
-            main.enabled = False
+            game.enabled = False
             print(f"🏁 [CONSOLE] Ban Royale ENDED manually in {ctx.guild.name} by {ctx.author.name}")
         
         # Reset decay mode if it was enabled
         if was_decay_mode:
-            main.config['decay_mode'] = False
+            main.games.set(ctx.guild.id, 'decay_mode', False)
         
         # Reset game state (clear checkpoints and any remaining tracking)
         main.reset_game_state(ctx.guild.id)
+        await main.store.flush()
         
         # Remove all spectator roles
         await main.clear_spectator_roles(ctx.guild)
@@ -496,15 +648,13 @@ class BasicCommands(commands.Cog):
         await ctx.send(embed=final_embed)
         
         # Log to ban logs channel
-        log_channel = self.bot.get_channel(main.config['ban_logs'])
-        if log_channel:
-            log_msg = f"🏁 **GAME ENDED** by {ctx.author.mention}\n"
-            log_msg += f"Final stats: {banned_count}/{effective_count} banned, {remaining_count} remained\n"
-            log_msg += f"Unbanned: {unbanned_count}, Failed: {failed_count}\n"
-            log_msg += f"Ban Royale disabled"
-            if was_decay_mode:
-                log_msg += f", Decay mode reset"
-            await log_channel.send(log_msg)
+        log_msg = f"🏁 **GAME ENDED** by {ctx.author.mention}\n"
+        log_msg += f"Final stats: {banned_count}/{effective_count} banned, {remaining_count} remained\n"
+        log_msg += f"Unbanned: {unbanned_count}, Failed: {failed_count}\n"
+        log_msg += f"Ban Royale disabled"
+        if was_decay_mode:
+            log_msg += f", Decay mode reset"
+        main.send(main.setting(ctx.guild.id, 'ban_logs'), log_msg, priority=Priority.CHECKPOINT)
 
 
 async def setup(bot: commands.Bot):
@@ -26,11 +26,13 @@ class DecayCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
-        main.config['decay_mode'] = not main.config['decay_mode']
-        status = "**enabled**" if main.config['decay_mode'] else "**disabled**"
+        decay_mode = not main.setting(ctx.guild.id, 'decay_mode')
+        main.games.set(ctx.guild.id, 'decay_mode', decay_mode)
+        status = "**enabled**" if decay_mode else "**disabled**"
         await ctx.send(f"Decay mode has been {status}!")
         
-        if main.config['decay_mode']:
+        if decay_mode:
+            await main.ensure_participants(ctx.guild)
             effective_count = main.get_effective_member_count(ctx.guild)
             await ctx.send(f"📊 Effective members for decay calculations: **{effective_count}** (excluding bots and bot masters)")
 
@@ -57,10 +59,11 @@ class DecayCommands(commands.Cog):
             return await ctx.send(f"{ctx.author.mention}, The minimum decay chance is **0.01%**!")
         if chance > 1.0:
             return await ctx.send(f"{ctx.author.mention}, The maximum decay chance is **100%**!")
-        if chance >= main.config['max_decay_chance']:
-            return await ctx.send(f"{ctx.author.mention}, Minimum decay chance must be less than maximum decay chance ({main.config['max_decay_chance']*100:.1f}%)!")
+        max_chance = main.setting(ctx.guild.id, 'max_decay_chance')
+        if chance >= max_chance:
+            return await ctx.send(f"{ctx.author.mention}, Minimum decay chance must be less than maximum decay chance ({max_chance*100:.1f}%)!")
         
-        main.config['min_decay_chance'] = chance
+        main.games.set(ctx.guild.id, 'min_decay_chance', chance)
         await ctx.send(f"Minimum decay chance has been set to **{chance*100:.1f}%**!")
 
     @commands.command(name="decaymax", aliases=['dmax'])
@@ -86,10 +89,11 @@ class DecayCommands(commands.Cog):
             return await ctx.send(f"{ctx.author.mention}, The minimum decay chance is **0.01%**!")
         if chance > 1.0:
             return await ctx.send(f"{ctx.author.mention}, The maximum decay chance is **100%**!")
-        if chance <= main.config['min_decay_chance']:
-            return await ctx.send(f"{ctx.author.mention}, Maximum decay chance must be greater than minimum decay chance ({main.config['min_decay_chance']*100:.1f}%)!")
+        min_chance = main.setting(ctx.guild.id, 'min_decay_chance')
+        if chance <= min_chance:
+            return await ctx.send(f"{ctx.author.mention}, Maximum decay chance must be greater than minimum decay chance ({min_chance*100:.1f}%)!")
         
-        main.config['max_decay_chance'] = chance
+        main.games.set(ctx.guild.id, 'max_decay_chance', chance)
         await ctx.send(f"Maximum decay chance has been set to **{chance*100:.1f}%**!")
 
 
@@ -1,8 +1,10 @@
 import discord
-import asyncio
+import time
 from discord.ext import commands
 
 from main import Main
+from outbound import Priority
+from unbans import format_duration
 
 class UnbanCommands(commands.Cog):
     """Unban commands for Ban Royale (mass unban functionality)"""
@@ -28,85 +30,116 @@ class UnbanCommands(commands.Cog):
         if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
             return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
         
-        banned_users = main.load_banned_users(ctx.guild.id)
+        if main.unban_job_running(ctx.guild.id):
+            return await ctx.send(f"{ctx.author.mention}, A mass unban is already running in this server! Check `!unbanstatus`")
         
-        if not banned_users:
+        banned_user_ids = main.get_banned_user_ids(ctx.guild.id)
+        
+        if not banned_user_ids:
             return await ctx.send(f"{ctx.author.mention}, No users are currently tracked as banned during this event!")
         
-        # Count only actual user IDs (exclude special keys that start with underscore)
-        total_users = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
+        total_users = len(banned_user_ids)
         await ctx.send(f"Starting to unban {total_users} users banned during the event... This may take a while to avoid rate limits.")
         
-        unbanned_count = 0
-        failed_count = 0
-        processed_count = 0
-        
-        # Calculate progress increment based on total users
-        progress_increment = main.get_progress_increment(total_users)
-        
-        # Send initial progress message
-        progress_msg = await ctx.send(f"Progress: 0/{total_users} processed...")
-        
-        banned_users_list = list(banned_users.items())
-        
-        for i, (user_id_str, user_info) in enumerate(banned_users_list):
-            # Skip special keys that start with underscore (like '_logged_checkpoints')
-            if user_id_str.startswith('_'):
-                continue
-            user_id = int(user_id_str)
-            processed_count += 1
-            
-            retry_count = 0
-            max_retries = 3
-            success = False
-            
-            while retry_count < max_retries and not success:
-                try:
-                    ban_entry = await ctx.guild.fetch_ban(discord.Object(id=user_id))
-                    await ctx.guild.unban(ban_entry.user, reason=f"Event mass unban by {ctx.author.name}")
-                    main.remove_banned_user(ctx.guild.id, user_id)
-                    unbanned_count += 1
-                    success = True
-                    
-                except discord.NotFound:
-                    # User is not actually banned, remove from tracking
-                    main.remove_banned_user(ctx.guild.id, user_id)
-                    unbanned_count += 1  # Count as success since they're no longer banned
-                    success = True
-                    
-                except discord.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        retry_count += 1
-                        wait_time = min(retry_count * 5, 30)  # Progressive backoff, max 30 seconds
-                        await asyncio.sleep(wait_time)
-                    else:
-                        failed_count += 1
-                        success = True  # Don't retry for other HTTP errors
-                        
-                except discord.Forbidden:
-                    failed_count += 1
-                    success = True  # Don't retry for permission errors
-            
-            if not success:
-                failed_count += 1
-            
-            # Add delay between operations to avoid rate limiting (1.5 seconds)
-            await asyncio.sleep(1.5)
-            
-            # Update progress based on calculated increment or on the last user
-            if processed_count % progress_increment == 0 or processed_count == total_users:
-                try:
-                    await progress_msg.edit(content=f"Progress: {processed_count}/{total_users} processed... (Unbanned: {unbanned_count}, Failed: {failed_count})")
-                except discord.HTTPException:
-                    # If we can't edit the progress message, continue anyway
-                    pass
+        result = await main.perform_mass_unban(
+            ctx,
+            banned_user_ids,
+            reason=f"Event mass unban by {ctx.author.name}",
+            progress_text=f"Progress: 0/{total_users} processed...",
+            kind='unbanall'
+        )
+        if result is None:
+            return await ctx.send(f"{ctx.author.mention}, A mass unban is already running in this server! Check `!unbanstatus`")
+        unbanned_count, failed_count = result
         
         await ctx.send(f"Unban complete! Successfully unbanned **{unbanned_count}** users. Failed: **{failed_count}** users.")
         
         # Log the mass unban
-        log_channel = self.bot.get_channel(main.config['ban_logs'])
-        if log_channel:
-            await log_channel.send(f"{ctx.author.mention} performed a mass unban of event participants! Unbanned: {unbanned_count}, Failed: {failed_count}")
+        main.send(
+            main.setting(ctx.guild.id, 'ban_logs'),
+            f"{ctx.author.mention} performed a mass unban of event participants! Unbanned: {unbanned_count}, Failed: {failed_count}",
+            priority=Priority.CHECKPOINT
+        )
+
+
+    @commands.command(name="unbanstatus", aliases=['us'])
+    async def _unbanstatus(self, ctx: commands.Context):
+        """Show the progress, throughput and ETA of the running mass unban"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        # need to be a bot master to use this command
+        if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
+            return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
+        
+        job = main.unban_jobs.get(ctx.guild.id)
+        if job is None:
+            if ctx.guild.id in main.store.get_unban_jobs():
+                return await ctx.send(f"{ctx.author.mention}, An interrupted mass unban is waiting to be resumed.")
+            return await ctx.send(f"{ctx.author.mention}, No mass unban is running right now!")
+        
+        run = main.unban_engine.runs.get(ctx.guild.id)
+        percentage = (job.processed / job.total) * 100 if job.total > 0 else 100
+        embed = discord.Embed(
+            title="🔓 Mass Unban Status",
+            description=f"**{job.processed}/{job.total}** processed ({percentage:.1f}%)",
+            color=0x00bfff
+        )
+        embed.add_field(name="✅ Unbanned", value=f"{job.unbanned}", inline=True)
+        embed.add_field(name="❌ Failed", value=f"{job.failed}", inline=True)
+        embed.add_field(name="📋 Type", value=f"`!{job.kind}` by {job.requested_by}", inline=True)
+        
+        if run is not None and run.processed > 0:
+            # Throughput of this run only, an earlier run before a restart doesn't count
+            per_second = run.processed / run.elapsed
+            remaining = job.total - job.processed
+            embed.add_field(name="⚡ Throughput", value=f"{per_second * 60:.0f} users/min", inline=True)
+            embed.add_field(name="⏳ ETA", value=format_duration(remaining / per_second), inline=True)
+            embed.add_field(name="🔀 Concurrency", value=f"{run.limit}/{run.max_concurrency} (rate limited {run.rate_limits}x)", inline=True)
+        
+        embed.set_footer(text=f"Running for {format_duration(time.time() - job.started_at)}")
+        await ctx.send(embed=embed)
+
+
+    @commands.command(name="reconcile", aliases=['rc'])
+    async def _reconcile(self, ctx: commands.Context, mode: str = None):
+        """Compare tracked event bans with the server's ban list (`!reconcile fix` to correct the tracking)"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        # need to be a bot master to use this command
+        if not any(role.id == main.config['bot_master'] for role in ctx.author.roles):
+            return await ctx.send(f"{ctx.author.mention}, You don't have permission to use this command!")
+        
+        fix = mode is not None and mode.lower() == 'fix'
+        status_msg = await ctx.send("🔍 Reading the server's ban list...")
+        try:
+            result = await main.reconcile(ctx.guild, fix)
+        except discord.Forbidden:
+            return await status_msg.edit(content=f"{ctx.author.mention}, I can't read the ban list! (missing Ban Members permission)")
+        
+        embed = discord.Embed(
+            title="🔍 Ban Reconciliation",
+            description="Tracked bans match the server's ban list!" if result.in_sync else
+                        ("Tracking has been corrected." if fix else "Run `!reconcile fix` to correct the tracking."),
+            color=0x00ff00 if result.in_sync or fix else 0xffa500
+        )
+        embed.add_field(name="🚫 Server Bans", value=f"{result.scanned}", inline=True)
+        embed.add_field(name="📋 Tracked", value=f"{result.tracked}", inline=True)
+        embed.add_field(
+            name=f"🔓 Tracked but not banned ({len(result.stale)})",
+            value=" ".join(f"<@{user_id}>" for user_id in result.stale[:15]) or "None",
+            inline=False
+        )
+        embed.add_field(
+            name=f"❓ Banned by the game but untracked ({len(result.untracked)})",
+            value=" ".join(f"<@{user_id}>" for user_id, _, _ in result.untracked[:15]) or "None",
+            inline=False
+        )
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        await status_msg.edit(content=None, embed=embed)
 
 
 async def setup(bot: commands.Bot):
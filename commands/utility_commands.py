@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 
 from main import Main
+from progress import ProgressSnapshot
 
 class UtilityCommands(commands.Cog):
     """Utility commands for Ban Royale (remaining participants, etc.)"""
@@ -26,7 +27,7 @@ class UtilityCommands(commands.Cog):
         if not ctx.guild:
             return await ctx.send("This command can only be used in servers.")
         
-        if not main.enabled:
+        if not main.games.is_enabled(ctx.guild.id):
             embed = discord.Embed(
                 title="📊 Game Status",
                 description="No Ban Royale game is currently active.",
@@ -35,35 +36,88 @@ class UtilityCommands(commands.Cog):
             embed.set_footer(text=f"Requested by {ctx.author.display_name}")
             return await ctx.send(embed=embed)
         
-        effective_count = main.get_effective_member_count(ctx.guild)
-        banned_users = main.load_banned_users(ctx.guild.id)
-        banned_count = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
-        remaining_members_list = main.get_remaining_members(ctx.guild)
-        remaining_count = len(remaining_members_list)
+        # Everyone spamming !r between two bans shares one snapshot and one rendered embed
+        snapshot = await main.get_progress(ctx.guild)
+        if snapshot.status_embed is None:
+            snapshot.status_embed = self.build_status_embed(snapshot)
         
-        # Calculate percentage
-        if effective_count > 0:
-            percentage_remaining = (remaining_count / effective_count) * 100
-            percentage_banned = (banned_count / effective_count) * 100
+        await ctx.send(embed=snapshot.status_embed)
+
+    @commands.command(name="leaderboard", aliases=['lb', 'top'])
+    async def _leaderboard(self, ctx: commands.Context):
+        """Show the top banners of the session, your rank and the best kill streaks"""
+        main = self.get_main_cog()
+        if not main:
+            return await ctx.send("Error: Main cog not found!")
+        
+        if not ctx.guild:
+            return await ctx.send("This command can only be used in servers.")
+        
+        game = main.games.get(ctx.guild.id)
+        if not len(game.ban_counts):
+            return await ctx.send(f"{ctx.author.mention}, Nobody has banned anyone this session yet!")
+        
+        embed = discord.Embed(
+            title="🏆 Ban Royale Leaderboard",
+            description=f"**{len(game.ban_counts)}** players have landed a ban this session",
+            color=0xffd700,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        # Top banners, read straight off the ranked buckets
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        embed.add_field(
+            name="⚔️ Top Banners",
+            value="\n".join(
+                f"{medals.get(rank, f'**#{rank}**')} <@{user_id}> - **{count}** bans"
+                for rank, user_id, count in game.ban_counts.top(10)
+            ),
+            inline=False
+        )
+        
+        # Longest streaks of bans without a failed roll, with the streak each player is on right now
+        embed.add_field(
+            name="🔥 Kill Streaks",
+            value="\n".join(
+                f"**#{rank}** <@{user_id}> - best **{best}**, current **{game.streaks.get(user_id, 0)}**"
+                for rank, user_id, best in game.best_streaks.top(5)
+            ),
+            inline=False
+        )
+        
+        rank = game.ban_counts.rank(ctx.author.id)
+        if rank is None:
+            you = "No bans yet this session"
         else:
-            percentage_remaining = 0
-            percentage_banned = 0
+            you = (f"Rank **#{rank}** with **{game.ban_counts.get(ctx.author.id)}** bans, "
+                   f"current streak **{game.streaks.get(ctx.author.id, 0)}** (best **{game.best_streaks.get(ctx.author.id)}**)")
+        embed.add_field(name="🎯 You", value=you, inline=False)
+        
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        await ctx.send(embed=embed)
+
+    def build_status_embed(self, snapshot: ProgressSnapshot) -> discord.Embed:
+        """Render the game status embed for a progress snapshot"""
+        effective_count = snapshot.effective_count
+        banned_count = snapshot.banned_count
+        remaining_count = snapshot.remaining_count
         
         embed = discord.Embed(
             title="📊 Ban Royale Status",
             description="Current game statistics",
-            color=0x00ff00 if remaining_count > 1 else 0xffd700
+            color=0x00ff00 if remaining_count > 1 else 0xffd700,
+            timestamp=discord.utils.utcnow()
         )
         
         embed.add_field(
             name="👥 Participants Remaining",
-            value=f"**{remaining_count}** out of {effective_count} ({percentage_remaining:.1f}%)",
+            value=f"**{remaining_count}** out of {effective_count} ({snapshot.percentage_remaining:.1f}%)",
             inline=False
         )
         
         embed.add_field(
             name="💀 Participants Banned",
-            value=f"**{banned_count}** out of {effective_count} ({percentage_banned:.1f}%)",
+            value=f"**{banned_count}** out of {effective_count} ({snapshot.percentage_banned:.1f}%)",
             inline=False
         )
         
@@ -80,9 +134,10 @@ class UtilityCommands(commands.Cog):
         else:
             embed.add_field(name="🎯 Status", value="**Game in progress**", inline=False)
         
-        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        # Shared between requesters, so no "Requested by" footer; the timestamp shows how fresh it is
+        embed.set_footer(text="Last updated")
         
-        await ctx.send(embed=embed)
+        return embed
 
 async def setup(bot: commands.Bot):
     """Setup function for the cog"""
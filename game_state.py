@@ -0,0 +1,84 @@
+from idsets import IdSet
+from leaderboard import Leaderboard
+
+# Settings a server can change for its own game with commands, everything else is global configuration
+GAME_SETTINGS = ('ban_chance', 'ban_delay', 'decay_mode', 'min_decay_chance', 'max_decay_chance', 'ban_channel',
+                 'ban_logs')
+
+
+class GameState:
+    """One server's Ban Royale game"""
+    __slots__ = ('guild_id', 'enabled', 'ban_counts', 'streaks', 'best_streaks', 'initial_participants', 'overrides')
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.enabled = False
+        self.ban_counts = Leaderboard()  # bans this session per banning user
+        self.streaks = {}  # {user_id: won rolls since their last failed roll}
+        self.best_streaks = Leaderboard()  # longest streak this session per user
+        self.initial_participants = None  # IdSet of who was in the game when it started, None before any game
+        self.overrides = {}  # {setting: value} changed by commands in this server
+
+    def start(self, initial_participants: IdSet) -> None:
+        self.enabled = True
+        self.clear_session()
+        self.initial_participants = initial_participants
+
+    def record_hit(self, author_id: int) -> None:
+        """A won ban roll extends the author's streak. Streaks follow rolls, in the order they were made, rather
+        than the queued bans, which are applied later"""
+        streak = self.streaks.get(author_id, 0) + 1
+        self.streaks[author_id] = streak
+        if streak > self.best_streaks.get(author_id):
+            self.best_streaks.increment(author_id)  # a streak only grows one roll at a time
+
+    def record_miss(self, author_id: int) -> None:
+        """A failed ban roll ends the author's streak"""
+        self.streaks.pop(author_id, None)
+
+    def record_ban(self, author_id: int) -> int:
+        """Count an applied ban for the session, returns the author's new total"""
+        return self.ban_counts.increment(author_id)
+
+    def clear_session(self) -> None:
+        self.ban_counts.clear()
+        self.streaks.clear()
+        self.best_streaks.clear()
+
+    def reset(self) -> None:
+        """Forget the session (counts, streaks and initial participants), settings stay"""
+        self.clear_session()
+        self.initial_participants = None
+
+
+class GameRegistry:
+    """GameState per server, so every server runs its own independent game"""
+
+    def __init__(self, config: dict):
+        self.config = config  # defaults for settings a server hasn't overridden
+        self.games = {}  # {guild_id: GameState}
+
+    def get(self, guild_id: int) -> GameState:
+        game = self.games.get(guild_id)
+        if game is None:
+            game = self.games[guild_id] = GameState(guild_id)
+        return game
+
+    def is_enabled(self, guild_id: int) -> bool:
+        game = self.games.get(guild_id)
+        return game is not None and game.enabled
+
+    def setting(self, guild_id: int, name: str):
+        """A game setting for a server: its own override, or the global default"""
+        game = self.games.get(guild_id)
+        if game is not None and name in game.overrides:
+            return game.overrides[name]
+        return self.config[name]
+
+    def set(self, guild_id: int, name: str, value) -> None:
+        if name not in GAME_SETTINGS:
+            raise KeyError(name)
+        self.get(guild_id).overrides[name] = value
+
+    def active_count(self) -> int:
+        return sum(1 for game in self.games.values() if game.enabled)
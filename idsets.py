@@ -0,0 +1,71 @@
+from array import array
+from bisect import bisect_left
+
+
+class IdSet:
+    """Set of Discord IDs stored as a sorted array of unsigned 64-bit ints (8 bytes per ID instead of a boxed int)"""
+    __slots__ = ('ids',)
+
+    def __init__(self, ids=()):
+        self.ids = array('Q', sorted(set(ids)))
+
+    @classmethod
+    def from_sorted(cls, ids: array) -> 'IdSet':
+        """Wrap an already sorted, duplicate-free array without copying it"""
+        id_set = cls.__new__(cls)
+        id_set.ids = ids
+        return id_set
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        index = bisect_left(self.ids, user_id)
+        return index < len(self.ids) and self.ids[index] == user_id
+
+    def __repr__(self) -> str:
+        return f"IdSet({len(self.ids)} ids)"
+
+    def add(self, user_id: int) -> bool:
+        """Insert an ID in place, returns whether it was new"""
+        index = bisect_left(self.ids, user_id)
+        if index < len(self.ids) and self.ids[index] == user_id:
+            return False
+        self.ids.insert(index, user_id)
+        return True
+
+    def discard(self, user_id: int) -> bool:
+        """Remove an ID if present, returns whether it was there"""
+        index = bisect_left(self.ids, user_id)
+        if index < len(self.ids) and self.ids[index] == user_id:
+            del self.ids[index]
+            return True
+        return False
+
+    def update(self, ids) -> None:
+        new_ids = [user_id for user_id in ids if user_id not in self]
+        if new_ids:
+            self.ids = array('Q', sorted(set(new_ids).union(self.ids)))
+
+    def copy(self) -> 'IdSet':
+        """Cheap snapshot, a single copy of the underlying buffer"""
+        return IdSet.from_sorted(array('Q', self.ids))
+
+    def difference(self, other: 'IdSet') -> 'IdSet':
+        """IDs in this set but not in the other, in one merge pass over both sorted arrays"""
+        result = array('Q')
+        others = other.ids
+        other_index = 0
+        other_count = len(others)
+        for user_id in self.ids:
+            while other_index < other_count and others[other_index] < user_id:
+                other_index += 1
+            if other_index < other_count and others[other_index] == user_id:
+                continue
+            result.append(user_id)
+        return IdSet.from_sorted(result)
+
+    __sub__ = difference
@@ -0,0 +1,65 @@
+from bisect import bisect_left, insort
+
+
+class Leaderboard:
+    """Per-player scores that only ever go up by one, with players bucketed by score so the top K and a player's
+    rank are read without sorting everyone. Ties are ordered by who reached the score first"""
+
+    def __init__(self):
+        self.scores = {}  # {user_id: score}
+        self.buckets = {}  # {score: dict of user_id -> None, insertion ordered}
+        self.levels = []  # sorted distinct scores that have a bucket
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def get(self, user_id: int) -> int:
+        return self.scores.get(user_id, 0)
+
+    def increment(self, user_id: int) -> int:
+        """Add one to a player's score and move them up a bucket, returns the new score"""
+        score = self.scores.get(user_id, 0)
+        if score:
+            self.leave(user_id, score)
+        score += 1
+        self.scores[user_id] = score
+
+        bucket = self.buckets.get(score)
+        if bucket is None:
+            bucket = self.buckets[score] = {}
+            insort(self.levels, score)
+        bucket[user_id] = None
+        return score
+
+    def leave(self, user_id: int, score: int) -> None:
+        bucket = self.buckets[score]
+        del bucket[user_id]
+        if not bucket:
+            del self.buckets[score]
+            del self.levels[bisect_left(self.levels, score)]
+
+    def top(self, k: int) -> list[tuple[int, int, int]]:
+        """Up to k (rank, user_id, score) from the top, tied players share a rank"""
+        entries = []
+        rank = 1
+        for score in reversed(self.levels):
+            bucket = self.buckets[score]
+            for user_id in bucket:
+                if len(entries) >= k:
+                    return entries
+                entries.append((rank, user_id, score))
+            rank += len(bucket)
+        return entries
+
+    def rank(self, user_id: int) -> int | None:
+        """1 + the number of players with a higher score, None for players without a score"""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        index = bisect_left(self.levels, score)
+        return 1 + sum(len(self.buckets[higher]) for higher in self.levels[index + 1:])
+
+    def clear(self) -> None:
+        self.scores.clear()
+        self.buckets.clear()
+        self.levels.clear()
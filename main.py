@@ -1,11 +1,25 @@
 import discord
 import os
-import json
 import asyncio
-from datetime import datetime
-from discord.ext import commands
+import re
+import signal
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
+from ban_queue import BanExecutor, BanJob
+from game_state import GameRegistry
+from idsets import IdSet
+from names import NameIndex, member_names
+from outbound import BanDigest, OutboundDispatcher, Priority
+from participants import GuildParticipants, ParticipantIndex
+from progress import ProgressCache, ProgressSnapshot
+from ratelimit import SlidingWindowLimiter
+from reconcile import ReconcileResult, reconcile_bans
+from retry import CircuitOpen, RetryPolicy, is_rate_limit
+from spectators import SpectatorManager
+from storage import ban_reason, create_store
+from unbans import UnbanEngine, UnbanJob
+
 load_dotenv()
 
 CONFIG = {
@@ -18,7 +32,36 @@ CONFIG = {
     "min_decay_chance": float(os.getenv('MIN_DECAY_CHANCE', '0.01')),
     "max_decay_chance": float(os.getenv('MAX_DECAY_CHANCE', '0.99')),
     "react_emoji": os.getenv('REACT_EMOJI', '✅'),
-    "spectator_role": os.getenv('SPECTATOR_ROLE_NAME', 'Ban Royale Spectator')
+    "spectator_role": os.getenv('SPECTATOR_ROLE_NAME', 'Ban Royale Spectator'),
+    "spectator_assign_rate": float(os.getenv('SPECTATOR_ASSIGN_RATE', '5')),
+    "welcome_dm_queue": int(os.getenv('WELCOME_DM_QUEUE', '50')),
+    "storage_backend": os.getenv('STORAGE_BACKEND', 'json').lower(),
+    "sqlite_path": os.getenv('SQLITE_PATH', 'event_banned_users.db'),
+    "data_dir": os.getenv('DATA_DIR', 'event_banned_users'),
+    "legacy_file": os.getenv('LEGACY_FILE', 'event_banned_users.json'),
+    "journal_mode": os.getenv('JOURNAL_MODE', 'true').lower() == 'true',
+    "compaction_interval": float(os.getenv('COMPACTION_INTERVAL', '60')),
+    "journal_compact_entries": int(os.getenv('JOURNAL_COMPACT_ENTRIES', '5000')),
+    "flush_delay": float(os.getenv('FLUSH_DELAY', '0.25')),
+    "large_guild_mode": os.getenv('LARGE_GUILD_MODE', 'false').lower() == 'true',
+    "message_cache_size": int(os.getenv('MESSAGE_CACHE_SIZE', '100')),
+    "outbound_rate": float(os.getenv('OUTBOUND_RATE', '1')),
+    "outbound_burst": int(os.getenv('OUTBOUND_BURST', '5')),
+    "outbound_queue": int(os.getenv('OUTBOUND_QUEUE', '50')),
+    "digest_ban_rate": float(os.getenv('DIGEST_BAN_RATE', '30')),
+    "digest_interval": float(os.getenv('DIGEST_INTERVAL', '5')),
+    "unban_concurrency": int(os.getenv('UNBAN_CONCURRENCY', '8')),
+    "unban_batch_size": int(os.getenv('UNBAN_BATCH_SIZE', '50')),
+    "reconcile_on_startup": os.getenv('RECONCILE_ON_STARTUP', 'off').lower(),
+    "ban_rate_burst": int(os.getenv('BAN_RATE_BURST', '3')),
+    "ban_rate_refill": float(os.getenv('BAN_RATE_REFILL', '1')),
+    "api_retry_deadline": float(os.getenv('API_RETRY_DEADLINE', '30')),
+    "api_retry_attempts": int(os.getenv('API_RETRY_ATTEMPTS', '5')),
+    "circuit_breaker_threshold": int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5')),
+    "circuit_breaker_cooldown": float(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '30')),
+    "sharded": os.getenv('SHARDED', 'false').lower() == 'true',
+    "shard_count": int(os.getenv('SHARD_COUNT', '0')) or None,
+    "shard_ids": [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
 }
 
 class NitroButtonView(discord.ui.View):
@@ -46,12 +89,28 @@ class NitroButtonView(discord.ui.View):
         else:
             await interaction.response.send_message("hehe u got tricked theres no nitro", ephemeral=True)
 
-class BotRoyaleBot(commands.Bot):
+# Sharded mode runs the gateway connections as shards (all of them, or the SHARD_IDS range a cluster worker owns)
+BotBase = commands.AutoShardedBot if CONFIG['sharded'] else commands.Bot
+
+class BotRoyaleBot(BotBase):
     def __init__(self):
         intents = discord.Intents.default()
         intents.members = True
         intents.message_content = True
         
+        # Large guild mode: no chunking at startup and no member cache, guilds are chunked when a game starts there
+        large_guild_options = {}
+        if CONFIG['large_guild_mode']:
+            large_guild_options = {
+                "chunk_guilds_at_startup": False,
+                "member_cache_flags": discord.MemberCacheFlags.none(),
+                "max_messages": CONFIG['message_cache_size'] or None
+            }
+        
+        shard_options = {}
+        if CONFIG['sharded']:
+            shard_options = {"shard_count": CONFIG['shard_count'], "shard_ids": CONFIG['shard_ids']}
+        
         super().__init__(
             command_prefix="!",
             case_insensitive=True,
@@ -60,11 +119,14 @@ class BotRoyaleBot(commands.Bot):
                 roles=False,
                 everyone=False
             ),
-            intents=intents
+            intents=intents,
+            **large_guild_options,
+            **shard_options
         )
         
         self.remove_command('help')
         self.config = CONFIG
+        self.health_reporter = None  # set by cluster.py in worker processes
 
     async def setup_hook(self):
         """Called when the bot is starting up"""
@@ -86,6 +148,23 @@ class BotRoyaleBot(commands.Bot):
                 print(f"Failed to load {module}: {e}")
         
         print(f"Loaded cogs successfully!")
+        
+        # Slash commands (/ban) are registered with Discord by !sync, only needed after they change
+        
+        # SIGTERM (the cluster supervisor stopping a worker, or a service manager) shuts down like Ctrl+C does:
+        # close() unloads the cogs, which flushes the ban store's pending writes
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.request_close)
+        except NotImplementedError:
+            pass  # Windows, no signal handlers on the event loop
+        
+        if self.health_reporter is not None:
+            self.health_reporter.start(self)
+
+    def request_close(self) -> None:
+        if not self.is_closed():
+            print("🛑 [CONSOLE] Received SIGTERM, shutting down...")
+            asyncio.create_task(self.close())
 
     async def on_ready(self):
         """Called when the bot is ready"""
@@ -100,187 +179,285 @@ class Main(commands.Cog):
     def __init__(self, bot: BotRoyaleBot) -> None:
         self.bot = bot
         self.config = self.bot.config
-        self.enabled = False
-        self.banned_users_file = "event_banned_users.json"
-        self.session_ban_counts = {}  # Track ban counts per user per session
-        self.initial_participants = {}  # Track who was in the game when it started {guild_id: set(user_ids)}
+        # Each server's game (enabled, session ban counts, initial participants, setting overrides)
+        self.games = GameRegistry(self.config)
+        # Persistence for users banned during the event (JSON snapshot + journal, or SQLite)
+        self.store = create_store(self.config)
+        # Every command's server is read from disk in a thread before the command runs, not on the event loop
+        self.bot.before_invoke(self.load_guild_store)
+        # Who is eligible / still in the game per server, kept current from gateway events
+        self.participants = ParticipantIndex(
+            self.config['bot_master'],
+            self.store.get_banned_user_ids,
+            large_guild_mode=self.config['large_guild_mode']
+        )
+        # Retry/backoff for Discord API calls (bans, unbans, roles), shared so rate limits and outages are seen once
+        self.api = RetryPolicy(
+            deadline=self.config['api_retry_deadline'],
+            max_attempts=self.config['api_retry_attempts'],
+            breaker_threshold=self.config['circuit_breaker_threshold'],
+            breaker_cooldown=self.config['circuit_breaker_cooldown']
+        )
+        # Spectator role ID and holders per server
+        self.spectators = SpectatorManager(
+            self.config['spectator_role'],
+            self.api,
+            assign_rate=self.config['spectator_assign_rate'],
+            dm_queue_size=self.config['welcome_dm_queue'],
+            member_cache=not self.config['large_guild_mode']
+        )
+        # Progress snapshots for !remaining / !config / !endgame, recomputed only when the index changes
+        self.progress = ProgressCache()
+        # Per-player limit on !ban attempts, checked before the command does any work
+        self.ban_limiter = SlidingWindowLimiter(self.config['ban_rate_burst'], self.config['ban_rate_refill'])
+        # Bans that won their roll, applied per server in order with the ban delay between them
+        self.ban_executor = BanExecutor(self.execute_ban, lambda guild_id: self.setting(guild_id, 'ban_delay'))
+        # Every game announcement goes out through here, rate shaped and prioritised per channel
+        self.outbound = OutboundDispatcher(
+            rate=self.config['outbound_rate'],
+            burst=self.config['outbound_burst'],
+            max_queue=self.config['outbound_queue']
+        )
+        # Mass unbans for !unbanall and !endgame, concurrency adapts to rate limits
+        self.unban_engine = UnbanEngine(self.api, max_concurrency=self.config['unban_concurrency'])
+        self.unban_jobs = {}  # {guild_id: UnbanJob running in this process}
+        self.started_up = False
+        # Name lookups for !ban and /ban autocomplete, filtered by who is still in the game at query time
+        self.name_indexes = {}  # {guild_id: NameIndex}
+        # Serializes recording bans, checkpoints and the win check per server across the ban queue, sudden death
+        # and reconciliation; Discord calls and announcements stay outside it
+        self.guild_locks = {}  # {guild_id: asyncio.Lock}
+        # Ban announcements are batched into digests while bans are frequent
+        self.ban_digest = BanDigest(
+            self.send_ban_digest,
+            threshold=self.config['digest_ban_rate'],
+            interval=self.config['digest_interval']
+        )
 
-    def load_all_banned_data(self) -> dict:
-        """Load all banned users data from the file"""
-        try:
-            with open(self.banned_users_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+    async def cog_load(self) -> None:
+        """Start the background store writer and maintenance (journal compaction)"""
+        await self.store.start()
+        self.compact_store_task.change_interval(seconds=self.config['compaction_interval'])
+        self.compact_store_task.start()
+
+    async def cog_unload(self) -> None:
+        """Stop the background maintenance and persist anything outstanding"""
+        self.compact_store_task.cancel()
+        self.ban_executor.close()
+        self.ban_digest.close()
+        self.outbound.close()
+        self.spectators.close()
+        await self.store.flush()
+        self.store.close()
+
+    @tasks.loop(seconds=60)
+    async def compact_store_task(self):
+        """Periodically compact the ban store"""
+        self.store.compact()
+    
+    def get_banned_user_ids(self, guild_id: int) -> list[int]:
+        """Get the IDs of users banned during the event for a specific server"""
+        return self.store.get_banned_user_ids(guild_id)
     
-    def load_banned_users(self, guild_id: int) -> dict:
-        """Load the list of users banned during the event for a specific server"""
-        all_data = self.load_all_banned_data()
-        return all_data.get(str(guild_id), {})
+    async def load_guild_store(self, ctx: commands.Context) -> None:
+        if ctx.guild is not None:
+            await self.store.load(ctx.guild.id)
+    
+    def get_banned_count(self, guild_id: int) -> int:
+        """Get how many users were banned during the event for a specific server"""
+        return self.store.get_banned_count(guild_id)
     
     def save_banned_user(self, guild_id: int, user_id: int, username: str, banned_by: str):
-        """Save a banned user to the tracking file for a specific server"""
-        all_data = self.load_all_banned_data()
-        guild_id_str = str(guild_id)
-        user_id_str = str(user_id)
-        
-        if guild_id_str not in all_data:
-            all_data[guild_id_str] = {}
-        
-        all_data[guild_id_str][user_id_str] = {
-            "username": username,
-            "banned_by": banned_by,
-            "banned_at": datetime.now().isoformat(),
-            "ban_reason": f"Ban Royale: Banned by {banned_by}"
-        }
-        
-        with open(self.banned_users_file, 'w') as f:
-            json.dump(all_data, f, indent=2)
-    
-    def remove_banned_user(self, guild_id: int, user_id: int):
-        """Remove a user from the banned users tracking file for a specific server"""
-        all_data = self.load_all_banned_data()
-        guild_id_str = str(guild_id)
-        user_id_str = str(user_id)
-        
-        if guild_id_str in all_data and user_id_str in all_data[guild_id_str]:
-            del all_data[guild_id_str][user_id_str]
-            
-            # Clean up empty server entries
-            if not all_data[guild_id_str]:
-                del all_data[guild_id_str]
-            
-            with open(self.banned_users_file, 'w') as f:
-                json.dump(all_data, f, indent=2)
-            return True
-        return False
+        """Save a banned user to the tracking store for a specific server"""
+        self.store.save_banned_user(guild_id, user_id, username, banned_by)
+        self.participants.mark_banned(guild_id, user_id)
+    
+    def save_banned_users(self, guild_id: int, users: list[tuple[int, str]], banned_by: str) -> None:
+        """Save many banned users to the tracking store in a single write"""
+        self.store.save_banned_users(guild_id, users, banned_by)
+        self.participants.mark_banned_many(guild_id, [user_id for user_id, _ in users])
+    
+    def remove_banned_users(self, guild_id: int, user_ids: list[int]) -> int:
+        """Remove many users from the tracking store in a single write"""
+        removed = self.store.remove_banned_users(guild_id, user_ids)
+        self.participants.mark_unbanned_many(guild_id, user_ids)
+        return removed
+
+    def get_participants(self, guild: discord.Guild) -> GuildParticipants:
+        """Get the eligible/banned/remaining participant sets for a server (loaded ones only in large guild mode)"""
+        return self.participants.get(guild)
+
+    async def ensure_participants(self, guild: discord.Guild) -> GuildParticipants:
+        """Get a server's participant sets, loading them first if large guild mode hasn't yet"""
+        if self.config['large_guild_mode'] and not self.participants.is_loaded(guild.id):
+            return await self.load_participants(guild)
+        return self.get_participants(guild)
+
+    async def load_participants(self, guild: discord.Guild) -> GuildParticipants:
+        """Make sure a server's participant sets are built, chunking its member list first in large guild mode"""
+        if not self.config['large_guild_mode']:
+            return self.get_participants(guild)
+        
+        # Fetch the member list without caching it, only IDs, the bot flag and role IDs are kept
+        members = await guild.chunk(cache=False)
+        participants = self.participants.build(guild, members)
+        self.name_indexes[guild.id] = NameIndex(members)
+        print(f"📥 [CONSOLE] Loaded {len(participants.eligible)} eligible members of {len(members)} in {guild.name}")
+        return participants
+
+    def refresh_member(self, member: discord.Member) -> None:
+        """Pick up a member's current roles (large guild mode only sees role changes when members show up)"""
+        if self.config['large_guild_mode'] and isinstance(member, discord.Member):
+            self.participants.member_updated(member)
+            self.name_indexes.get(member.guild.id, NameIndex()).add(member)
+
+    def get_name_index(self, guild: discord.Guild) -> NameIndex:
+        """Get a server's name index, built from the member cache on first use (or by load_participants)"""
+        index = self.name_indexes.get(guild.id)
+        if index is None:
+            if self.config['large_guild_mode']:
+                return NameIndex()  # Not loaded until a game starts here
+            index = self.name_indexes[guild.id] = NameIndex(guild.members)
+        return index
+
+    async def resolve_target(self, ctx: commands.Context, query: str) -> discord.Member | None:
+        """Resolve a !ban target from a mention, an ID or a name, names via the index of players still alive"""
+        user_id = None
+        match = re.fullmatch(r'<@!?(\d{15,20})>|(\d{15,20})', query.strip())
+        if match:
+            user_id = int(match.group(1) or match.group(2))
+        else:
+            user_id = self.get_name_index(ctx.guild).resolve(query.strip(), self.get_participants(ctx.guild).remaining)
+
+        if user_id is not None:
+            # Mentions come with the member attached, which is the only copy there is without a member cache
+            member = ctx.guild.get_member(user_id) or discord.utils.get(ctx.message.mentions, id=user_id)
+            if isinstance(member, discord.Member):
+                return member
+            try:
+                return await ctx.guild.fetch_member(user_id)
+            except discord.HTTPException:
+                return None
+
+        # The index only knows current names, so only name#discriminator still goes through the converter
+        # (a scan of the member list); any other name not among the players still alive can't be a target
+        if not re.fullmatch(r'.+#\d{4}', query.strip()):
+            return None
+        try:
+            return await commands.MemberConverter().convert(ctx, query)
+        except commands.BadArgument:
+            return None
+
+    def complete_targets(self, guild: discord.Guild, prefix: str, limit: int = 25) -> list[tuple[int, str]]:
+        """Names of players still alive starting with the prefix, for /ban autocomplete"""
+        return self.get_name_index(guild).complete(prefix, self.get_participants(guild).remaining, limit)
 
     def get_effective_member_count(self, guild: discord.Guild) -> int:
         """Get the effective member count for decay calculations (excluding bots, bot masters, and those above bot role)"""
         if not guild:
             return 0
-        
-        effective_count = 0
-        bot_master_role_id = self.config['bot_master']
-        bot_member = guild.get_member(self.bot.user.id)
-        bot_top_role_position = bot_member.top_role.position if bot_member else 0
-        
-        for member in guild.members:
-            # Skip bots
-            if member.bot:
-                continue
-            
-            # Skip users with bot master role
-            if any(role.id == bot_master_role_id for role in member.roles):
-                continue
-            
-            # Skip users with roles above the bot
-            if member.top_role.position >= bot_top_role_position:
-                continue
-            
-            effective_count += 1
-        
-        return effective_count
+        return len(self.get_participants(guild).eligible)
     
-    def get_remaining_members(self, guild: discord.Guild) -> list[discord.Member]:
-        """Get list of members who are still in the game (not banned, not bots, not bot masters, not above bot role)"""
+    def get_remaining_count(self, guild: discord.Guild) -> int:
+        """Get how many members are still in the game"""
         if not guild:
-            return []
-        
-        banned_users = self.load_banned_users(guild.id)
-        banned_user_ids = set([int(user_id) for user_id in banned_users.keys() if not user_id.startswith('_')])
-        bot_master_role_id = self.config['bot_master']
-        bot_member = guild.get_member(self.bot.user.id)
-        bot_top_role_position = bot_member.top_role.position if bot_member else 0
-        
-        remaining_members = []
-        for member in guild.members:
-            # Skip bots
-            if member.bot:
-                continue
-            
-            # Skip users with bot master role
-            if any(role.id == bot_master_role_id for role in member.roles):
-                continue
-            
-            # Skip users with roles above the bot
-            if member.top_role.position >= bot_top_role_position:
-                continue
-            
-            # Skip banned users
-            if member.id in banned_user_ids:
-                continue
-                
-            remaining_members.append(member)
-        
-        return remaining_members
+            return 0
+        return len(self.get_participants(guild).remaining)
+    
+    def get_winner(self, guild: discord.Guild) -> discord.Member | None:
+        """Get the last member standing, if exactly one remains"""
+        remaining = self.get_participants(guild).remaining
+        if len(remaining) != 1:
+            return None
+        return guild.get_member(next(iter(remaining)))
+    
+    async def fetch_winner(self, guild: discord.Guild) -> discord.Member | None:
+        """Get the last member standing, fetching them when the member cache is off"""
+        winner = self.get_winner(guild)
+        remaining = self.get_participants(guild).remaining
+        if winner is None and len(remaining) == 1:
+            try:
+                winner = await guild.fetch_member(next(iter(remaining)))
+            except discord.HTTPException:
+                return None
+        return winner
+    
+    async def get_progress(self, guild: discord.Guild) -> ProgressSnapshot:
+        """Get the server's progress snapshot, shared by every caller until a ban, unban or membership change"""
+        await self.ensure_participants(guild)  # make sure the sets exist before reading the version
+        version = self.participants.version(guild.id)
+        return await self.progress.get(guild.id, version, lambda: self.compute_progress(guild, version))
+    
+    async def compute_progress(self, guild: discord.Guild, version: int) -> ProgressSnapshot:
+        """Build a fresh progress snapshot for a server"""
+        participants = self.get_participants(guild)
+        return ProgressSnapshot(
+            version,
+            len(participants.eligible),
+            self.get_banned_count(guild.id),
+            len(participants.remaining)
+        )
     
     def get_logged_checkpoints(self, guild_id: int) -> list[int]:
         """Get the list of checkpoints already logged for a server"""
-        all_data = self.load_all_banned_data()
-        guild_data = all_data.get(str(guild_id), {})
-        return guild_data.get("_logged_checkpoints", [])
+        return self.store.get_logged_checkpoints(guild_id)
     
     def add_logged_checkpoint(self, guild_id: int, checkpoint: int) -> None:
         """Add a checkpoint to the logged list for a server"""
-        all_data = self.load_all_banned_data()
-        guild_id_str = str(guild_id)
-        
-        if guild_id_str not in all_data:
-            all_data[guild_id_str] = {}
-        
-        logged_checkpoints = all_data[guild_id_str].get("_logged_checkpoints", [])
-        if checkpoint not in logged_checkpoints:
-            logged_checkpoints.append(checkpoint)
-            all_data[guild_id_str]["_logged_checkpoints"] = sorted(logged_checkpoints)
-            
-            with open(self.banned_users_file, 'w') as f:
-                json.dump(all_data, f, indent=2)
+        self.store.add_logged_checkpoint(guild_id, checkpoint)
     
     async def check_and_log_checkpoints(self, guild: discord.Guild) -> None:
         """Check if we've hit new decay checkpoints and log them"""
-        if not self.config['decay_mode'] or not guild:
+        if not guild:
             return
+        async with self.guild_lock(guild.id):
+            messages = self.claim_checkpoints(guild)
+        for message in messages:
+            self.send(self.setting(guild.id, 'ban_logs'), message, priority=Priority.CHECKPOINT)
+    
+    def claim_checkpoints(self, guild: discord.Guild) -> list[str]:
+        """Mark newly reached decay checkpoints as logged, returns their log messages (call with the guild lock held)"""
+        if not self.setting(guild.id, 'decay_mode'):
+            return []
         
         effective_count = self.get_effective_member_count(guild)
-        banned_count = len(self.load_banned_users(guild.id))
+        banned_count = self.get_banned_count(guild.id)
         
         if effective_count <= 0:
-            return
+            return []
         
         progress_percentage = (banned_count / effective_count) * 100
         checkpoints = [10, 20, 30, 40, 50, 60, 70, 80, 90, 95]
         logged_checkpoints = self.get_logged_checkpoints(guild.id)
+        messages = []
         
         for checkpoint in checkpoints:
             if progress_percentage >= checkpoint and checkpoint not in logged_checkpoints:
                 # Calculate current ban chance for this checkpoint
                 current_chance = self.calculate_decay_chance(guild)
                 
-                # Log to ban logs channel
-                log_channel = self.bot.get_channel(self.config['ban_logs'])
-                if log_channel:
-                    await log_channel.send(
-                        f"📊 **Decay Checkpoint {checkpoint}%** reached!\n"
-                        f"Progress: {banned_count}/{effective_count} banned ({progress_percentage:.1f}%)\n"
-                        f"Current ban chance: **{current_chance*100:.1f}%**"
-                    )
+                messages.append(
+                    f"📊 **Decay Checkpoint {checkpoint}%** reached!\n"
+                    f"Progress: {banned_count}/{effective_count} banned ({progress_percentage:.1f}%)\n"
+                    f"Current ban chance: **{current_chance*100:.1f}%**"
+                )
                 
                 # Mark this checkpoint as logged
                 self.add_logged_checkpoint(guild.id, checkpoint)
+        return messages
     
     def calculate_decay_chance(self, guild: discord.Guild) -> float:
         """Calculate ban chance using decay mode (inverse curve)"""
         if not guild:
             return self.config['ban_chance']
         
+        ban_chance = self.setting(guild.id, 'ban_chance')
         effective_members = self.get_effective_member_count(guild)
-        banned_users = self.load_banned_users(guild.id)
-        banned_count = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
+        banned_count = self.get_banned_count(guild.id)
         
         if effective_members <= 0:
             # No valid members to calculate from, use default ban chance
-            return self.config['ban_chance']
+            return ban_chance
         
         # Calculate decay factor: as more people are banned, chance decreases
         # decay_factor ranges from 0 (all banned) to 1 (none banned)
@@ -288,8 +465,8 @@ class Main(commands.Cog):
         decay_factor = remaining_members / effective_members
         
         # Apply inverse curve: higher decay_factor = higher ban chance
-        min_chance = self.config['min_decay_chance']
-        max_chance = self.config['max_decay_chance']
+        min_chance = self.setting(guild.id, 'min_decay_chance')
+        max_chance = self.setting(guild.id, 'max_decay_chance')
         
         # Inverse curve: chance starts high and decreases as people are banned
         decay_chance = min_chance + (max_chance - min_chance) * decay_factor
@@ -298,219 +475,304 @@ class Main(commands.Cog):
     
     def get_current_ban_chance(self, guild: discord.Guild) -> float:
         """Get the current ban chance (either normal or decay mode)"""
-        if self.config['decay_mode']:
+        if self.setting(guild.id, 'decay_mode'):
             return self.calculate_decay_chance(guild)
         else:
-            return self.config['ban_chance']
+            return self.setting(guild.id, 'ban_chance')
 
     def reset_game_state(self, guild_id: int) -> bool:
         """Reset all game state for a server (checkpoints and banned users)"""
-        all_data = self.load_all_banned_data()
-        guild_id_str = str(guild_id)
+        # Reset session ban counts and initial participants tracking
+        self.games.get(guild_id).reset()
+        
+        # Bans and digests still waiting belong to the old game
+        self.ban_executor.cancel(guild_id)
+        self.ban_digest.cancel(guild_id)
+        
+        # Everyone tracked as banned is forgotten. A large guild's member data is only needed during a game,
+        # so it is released until the next !enable loads it again
+        if self.config['large_guild_mode']:
+            self.participants.forget(guild_id)
+            self.name_indexes.pop(guild_id, None)
+        else:
+            self.participants.reset_banned(guild_id)
         
-        # Reset session ban counts
-        self.session_ban_counts.clear()
+        return self.store.reset_guild(guild_id)
+    
+    def enqueue_ban(self, ctx: commands.Context, user: discord.Member) -> int:
+        """Queue a successful ban roll for the server's ban executor, returns how many bans are ahead of it"""
+        return self.ban_executor.enqueue(ctx.guild.id, BanJob(ctx, user))
+    
+    async def execute_ban(self, job: BanJob) -> bool:
+        """Apply a queued ban and report the result back, returns whether the ban went through"""
+        ctx, user = job.ctx, job.target
+        guild = ctx.guild
+        
+        # The game may have ended, or someone else got to them first, while this was queued
+        game = self.games.get(guild.id)
+        if not game.enabled:
+            return False
+        if user.id in self.get_participants(guild).banned:
+            self.reply(ctx, f"{ctx.author.mention}, **{user.name}** was already banned!")
+            return False
         
-        # Clear initial participants tracking
-        if guild_id in self.initial_participants:
-            del self.initial_participants[guild_id]
+        try:
+            await self.api.call('ban', lambda: user.ban(reason=ban_reason(ctx.author.name), delete_message_seconds=1))
+        except discord.Forbidden:
+            self.reply(ctx, f"{ctx.author.mention}, Can't ban this user! (insufficient permissions)")
+            return False
+        except CircuitOpen:
+            self.reply(ctx, f"{ctx.author.mention}, Discord is having trouble right now. Please try again later.")
+            return False
+        except (discord.RateLimited, discord.HTTPException) as e:
+            if is_rate_limit(e):
+                self.reply(ctx, f"{ctx.author.mention}, Failed to ban after multiple rate limit retries. Please try again later.")
+            else:
+                self.reply(ctx, f"Failed to ban user: {e}")
+            return False
         
-        if guild_id_str in all_data:
-            del all_data[guild_id_str]
+        # Record -> checkpoints -> win check as one step per server, so nothing is counted or announced twice
+        async with self.guild_lock(guild.id):
+            if user.id in self.get_participants(guild).banned:
+                return False  # Recorded meanwhile by another path (e.g. sudden death)
+            
+            # Track the banned user
+            self.save_banned_user(guild.id, user.id, user.name, ctx.author.name)
             
-            with open(self.banned_users_file, 'w') as f:
-                json.dump(all_data, f, indent=2)
-            return True
-        return False
+            # Update session ban count
+            ban_count = game.record_ban(ctx.author.id)
+            
+            checkpoint_messages = self.claim_checkpoints(guild)
+            game_over = self.claim_game_over(guild)
+        
+        # Player-facing I/O happens outside the lock
+        if ctx.interaction is None:
+            self.outbound.react(ctx.message, self.config['react_emoji'])
+        
+        # Announce in the ban channel and the logs channel, or fold into the next digest while bans are frequent
+        if not self.ban_digest.offer(guild.id, (ctx.author.id, ctx.author.mention, user.mention, ban_count)):
+            self.send(self.setting(guild.id, 'ban_channel'), f"{ctx.author.mention} banned {user.mention}! **({ban_count})**", merge=True)
+            self.send(self.setting(guild.id, 'ban_logs'), f"{ctx.author.mention} banned {user.mention}! ({ban_count})", merge=True)
+        
+        # Log decay checkpoints reached by this ban
+        for message in checkpoint_messages:
+            self.send(self.setting(guild.id, 'ban_logs'), message, priority=Priority.CHECKPOINT)
+        
+        # End the game if this was the deciding ban
+        if game_over is not None:
+            await self.announce_game_over(guild, *game_over)
+            return False  # no delay needed once the game is over
+        return True
+    
+    def send(self, channel_id: int, content: str = None, *, priority: Priority = Priority.BAN, **kwargs) -> None:
+        """Queue a message for a channel through the outbound dispatcher"""
+        self.outbound.send(self.bot.get_channel(channel_id), content, priority=priority, **kwargs)
     
-    async def get_or_create_spectator_role(self, guild: discord.Guild) -> discord.Role:
-        """Get or create the spectator role for the guild"""
-        spectator_role_name = self.config['spectator_role']
+    def reply(self, ctx: commands.Context, content: str, priority: Priority = Priority.FAILED) -> None:
+        """Queue a low priority reply in the command's channel (dropped first when the channel is backed up)"""
+        self.outbound.send(ctx.channel, content, priority=priority, merge=True)
+    
+    async def send_ban_digest(self, guild_id: int, entries: list) -> None:
+        """Publish buffered ban announcements as one embed in the ban and logs channels"""
+        shown = entries[:40]
+        lines = [f"{author} banned {target}! **({count})**" for _, author, target, count in shown]
+        if len(entries) > len(shown):
+            lines.append(f"...and **{len(entries) - len(shown)}** more")
+        
+        embed = discord.Embed(
+            title=f"⚔️ Ban Digest - {len(entries)} bans",
+            description="\n".join(lines),
+            color=0xff4500
+        )
         
-        # Check if role already exists
-        for role in guild.roles:
-            if role.name == spectator_role_name:
-                return role
+        # Running session totals for everyone who banned in this digest
+        ban_counts = self.games.get(guild_id).ban_counts
+        author_ids = list(dict.fromkeys(author_id for author_id, _, _, _ in entries))
+        totals = sorted(author_ids, key=ban_counts.get, reverse=True)
+        embed.add_field(
+            name="🏅 Session Totals",
+            value="\n".join(f"<@{author_id}> **{ban_counts.get(author_id)}**" for author_id in totals[:10]),
+            inline=False
+        )
+        embed.set_footer(text=f"Bans are being batched every {self.config['digest_interval']:g}s while the action is hot")
         
-        # Create the role if it doesn't exist
-        try:
-            role = await guild.create_role(
-                name=spectator_role_name,
-                color=discord.Color.gray(),
-                reason="Ban Royale spectator role for mid-game joiners"
-            )
-            print(f"📋 [CONSOLE] Created spectator role '{spectator_role_name}' in {guild.name}")
-            return role
-        except discord.Forbidden:
-            print(f"❌ [CONSOLE] Failed to create spectator role in {guild.name} - insufficient permissions")
-            return None
+        self.send(self.setting(guild_id, 'ban_channel'), embed=embed)
+        self.send(self.setting(guild_id, 'ban_logs'), embed=embed)
     
     async def clear_spectator_roles(self, guild: discord.Guild) -> None:
-        """Remove spectator role from all members and delete the role"""
-        spectator_role_name = self.config['spectator_role']
-        
-        for role in guild.roles:
-            if role.name == spectator_role_name:
-                # Remove role from all members who have it
-                members_with_role = []
-                for member in guild.members:
-                    if role in member.roles:
-                        members_with_role.append(member.display_name)
-                        try:
-                            await member.remove_roles(role, reason="Ban Royale game ended")
-                        except discord.Forbidden:
-                            print(f"❌ [CONSOLE] Failed to remove spectator role from {member.display_name}")
-                
-                # Delete the role
-                try:
-                    await role.delete(reason="Ban Royale game ended")
-                    if members_with_role:
-                        print(f"🗑️ [CONSOLE] Removed spectator role from {len(members_with_role)} members in {guild.name}")
-                except discord.Forbidden:
-                    print(f"❌ [CONSOLE] Failed to delete spectator role in {guild.name}")
-                break
+        """Remove the spectator role from everyone by deleting it"""
+        await self.spectators.teardown(guild)
     
+    def is_spectator(self, member: discord.Member) -> bool:
+        """Check whether a member joined mid-game and is spectating"""
+        return self.spectators.is_spectator(member)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        """Keep the participant index current when members leave or get banned"""
+        self.participants.member_left(payload.guild_id, payload.user.id)
+        index = self.name_indexes.get(payload.guild_id)
+        if index is not None:
+            index.remove(payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Re-check eligibility when a member's roles change, re-index them when their names change"""
+        index = self.name_indexes.get(after.guild.id)
+        if index is not None and member_names(before) != member_names(after):
+            index.add(after)
+        if before.roles == after.roles:
+            return
+        self.spectators.member_updated(before, after)
+        if after.id == self.bot.user.id:
+            # The bot's own top role moved, which changes eligibility for everyone
+            self.participants.invalidate(after.guild)
+        else:
+            self.participants.member_updated(after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        # Creating a role shifts positions, so eligibility has to be recomputed
+        self.participants.invalidate(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.participants.invalidate(role.guild)
+        if self.spectators.role_ids.get(role.guild.id) == role.id:
+            self.spectators.forget(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.position != after.position:
+            self.participants.invalidate(after.guild)
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Handle new members joining during an active game"""
-        if not self.enabled or member.bot:
+        self.participants.member_joined(member)
+        index = self.name_indexes.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+        
+        game = self.games.get(member.guild.id)
+        if not game.enabled or member.bot:
             return
         
-        guild = member.guild
-        if guild.id not in self.initial_participants:
+        if game.initial_participants is None:
             return  # No game was started in this guild
         
         # Check if this member was part of the initial participants
-        if member.id not in self.initial_participants[guild.id]:
-            # This is a mid-game joiner, add spectator role
-            spectator_role = await self.get_or_create_spectator_role(guild)
-            if spectator_role:
-                try:
-                    await member.add_roles(spectator_role, reason="Mid-game joiner - added to spectators")
-                    print(f"👀 [CONSOLE] Added spectator role to {member.display_name} (mid-game joiner) in {guild.name}")
-                    
-                    # Send a DM or welcome message explaining they're a spectator
-                    try:
-                        embed = discord.Embed(
-                            title="🎭 Welcome to the Ban Royale!",
-                            description=f"You joined **{guild.name}** during an active Ban Royale game.",
-                            color=0x808080
-                        )
-                        embed.add_field(
-                            name="👀 Spectator Status",
-                            value="You've been assigned as a spectator since the game was already in progress.",
-                            inline=False
-                        )
-                        embed.add_field(
-                            name="🚫 Restrictions",
-                            value="You cannot use `!ban` commands during this game.",
-                            inline=False
-                        )
-                        embed.add_field(
-                            name="⏰ Next Game",
-                            value="You'll be able to participate when the next game starts!",
-                            inline=False
-                        )
-                        await member.send(embed=embed)
-                    except discord.Forbidden:
-                        pass  # Can't send DM, that's fine
-                        
-                except discord.Forbidden:
-                    print(f"❌ [CONSOLE] Failed to add spectator role to {member.display_name}")
+        if member.id not in game.initial_participants:
+            # This is a mid-game joiner, queue them for the spectator role (and a welcome DM)
+            self.spectators.enqueue_join(member)
 
+    def setting(self, guild_id: int, name: str):
+        """A game setting for a server, its own override or the configured default"""
+        return self.games.setting(guild_id, name)
+    
+    def guild_lock(self, guild_id: int) -> asyncio.Lock:
+        """Lock around a server's record -> checkpoint -> win check sequence"""
+        return self.guild_locks.setdefault(guild_id, asyncio.Lock())
+    
+    def claim_game_over(self, guild: discord.Guild) -> tuple[int, int] | None:
+        """Disable the game if the win condition is met, returns (effective_count, remaining_count) to the one
+        caller that ended it (call with the guild lock held)"""
+        game = self.games.get(guild.id)
+        if not game.enabled:
+            return None
+        
+        remaining_count = self.get_remaining_count(guild)
+        if remaining_count > 1:
+            return None
+        
+        # Win condition met! Disable the game but preserve game state
+        game.enabled = False
+        return self.get_effective_member_count(guild), remaining_count
+    
     async def check_win_condition(self, guild: discord.Guild) -> bool:
         """Check if win condition is met and handle game end"""
-        if not self.enabled or not guild:
+        if not guild:
             return False
         
-        effective_count = self.get_effective_member_count(guild)
-        banned_users = self.load_banned_users(guild.id)
-        banned_count = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
-        remaining_members_list = self.get_remaining_members(guild)
-        remaining_count = len(remaining_members_list)
-        
-        if remaining_count <= 1:
-            # Win condition met! Disable the bot but preserve game state
-            self.enabled = False
-            
-            # Console log
-            if remaining_count == 1:
-                winner = remaining_members_list[0]
-                print(f"🏆 [CONSOLE] Ban Royale WIN CONDITION met in {guild.name} - Winner: {winner.name}")
-            else:
-                print(f"💀 [CONSOLE] Ban Royale TOTAL ELIMINATION in {guild.name} - everyone banned!")
+        async with self.guild_lock(guild.id):
+            game_over = self.claim_game_over(guild)
+        if game_over is None:
+            return False
+        
+        await self.announce_game_over(guild, *game_over)
+        return True
+    
+    async def announce_game_over(self, guild: discord.Guild, effective_count: int, remaining_count: int) -> None:
+        """Persist the final state and announce the winner (or total elimination)"""
+        await self.store.flush()
+        
+        # Console log
+        winner = await self.fetch_winner(guild)
+        if winner is None:
+            remaining_count = 0  # The last member couldn't be resolved (left the server)
+        if remaining_count == 1:
+            print(f"🏆 [CONSOLE] Ban Royale WIN CONDITION met in {guild.name} - Winner: {winner.name}")
+        else:
+            print(f"💀 [CONSOLE] Ban Royale TOTAL ELIMINATION in {guild.name} - everyone banned!")
+        
+        if remaining_count == 1:
+            win_embed = discord.Embed(
+                title="🏆 GAME OVER - We Have a Winner! 🏆",
+                description=f"**The Ban Royale has concluded with a victor!**\n\n🎉 **{winner.mention} is the CHAMPION!** 🎉",
+                color=0xffd700  # Gold color
+            )
+            win_embed.add_field(
+                name="🎯 Final Result",
+                value=f"Only **1 participant** remains out of **{effective_count}** original members!",
+                inline=False
+            )
+            win_embed.add_field(
+                name="🔴 Bot Status",
+                value="Ban Royale has been **disabled**",
+                inline=True
+            )
+            win_embed.add_field(
+                name="🔧 Next Steps",
+                value="Use `!endgame` to unban all participants and reset for the next event",
+                inline=True
+            )
+            win_embed.set_footer(text=f"🎉 Congratulations {winner.display_name}!")
             
-            # Get both channels
-            log_channel = self.bot.get_channel(self.config['ban_logs'])
-            ban_channel = self.bot.get_channel(self.config['ban_channel'])
+            # Check if nitro is available or if we should show the fake button
+            nitro_link = os.getenv('MAIN_NITRO_LINK', '').strip()
+            view = None
+            if nitro_link or True:  # Always show button, let the interaction handle the logic
+                view = NitroButtonView(winner.id)
             
-            if remaining_count == 1:
-                winner = remaining_members_list[0]
-                win_embed = discord.Embed(
-                    title="🏆 GAME OVER - We Have a Winner! 🏆",
-                    description=f"**The Ban Royale has concluded with a victor!**\n\n🎉 **{winner.mention} is the CHAMPION!** 🎉",
-                    color=0xffd700  # Gold color
-                )
-                win_embed.add_field(
-                    name="🎯 Final Result",
-                    value=f"Only **1 participant** remains out of **{effective_count}** original members!",
-                    inline=False
-                )
-                win_embed.add_field(
-                    name="🔴 Bot Status",
-                    value="Ban Royale has been **disabled**",
-                    inline=True
-                )
-                win_embed.add_field(
-                    name="🔧 Next Steps",
-                    value="Use `!endgame` to unban all participants and reset for the next event",
-                    inline=True
-                )
-                win_embed.set_footer(text=f"🎉 Congratulations {winner.display_name}!")
-                
-                # Check if nitro is available or if we should show the fake button
-                nitro_link = os.getenv('MAIN_NITRO_LINK', '').strip()
-                view = None
-                if nitro_link or True:  # Always show button, let the interaction handle the logic
-                    view = NitroButtonView(winner.id)
-                
-                # Send to both channels
-                if log_channel:
-                    await log_channel.send(embed=win_embed, view=view)
-                if ban_channel:
-                    await ban_channel.send(embed=win_embed, view=view)
-            else:
-                elimination_embed = discord.Embed(
-                    title="🏁 GAME OVER - Total Elimination! 🏁",
-                    description="**Every participant has been eliminated!**",
-                    color=0x8b0000  # Dark red color
-                )
-                elimination_embed.add_field(
-                    name="💀 Final Result",
-                    value=f"All **{effective_count}** participants have been banned!",
-                    inline=False
-                )
-                elimination_embed.add_field(
-                    name="🔴 Bot Status",
-                    value="Ban Royale has been **disabled**",
-                    inline=True
-                )
-                elimination_embed.add_field(
-                    name="🔧 Next Steps",
-                    value="Use `!endgame` to unban all participants and reset for the next event",
-                    inline=True
-                )
-                elimination_embed.set_footer(text="💀 No survivors remain...")
-                
-                # Send to both channels
-                if log_channel:
-                    await log_channel.send(embed=elimination_embed)
-                if ban_channel:
-                    await ban_channel.send(embed=elimination_embed)
+            # Send to both channels
+            self.send(self.setting(guild.id, 'ban_logs'), embed=win_embed, view=view, priority=Priority.WIN)
+            self.send(self.setting(guild.id, 'ban_channel'), embed=win_embed, view=view, priority=Priority.WIN)
+        else:
+            elimination_embed = discord.Embed(
+                title="🏁 GAME OVER - Total Elimination! 🏁",
+                description="**Every participant has been eliminated!**",
+                color=0x8b0000  # Dark red color
+            )
+            elimination_embed.add_field(
+                name="💀 Final Result",
+                value=f"All **{effective_count}** participants have been banned!",
+                inline=False
+            )
+            elimination_embed.add_field(
+                name="🔴 Bot Status",
+                value="Ban Royale has been **disabled**",
+                inline=True
+            )
+            elimination_embed.add_field(
+                name="🔧 Next Steps",
+                value="Use `!endgame` to unban all participants and reset for the next event",
+                inline=True
+            )
+            elimination_embed.set_footer(text="💀 No survivors remain...")
             
-            return True
-        
-        return False
+            # Send to both channels
+            self.send(self.setting(guild.id, 'ban_logs'), embed=elimination_embed, priority=Priority.WIN)
+            self.send(self.setting(guild.id, 'ban_channel'), embed=elimination_embed, priority=Priority.WIN)
 
     def get_progress_increment(self, total_users: int) -> int:
         """Calculate appropriate progress update increment based on total users"""
@@ -525,78 +787,161 @@ class Main(commands.Cog):
         else:
             return max(25, total_users // 10)  # Update every 25 users or 10% of total, whichever is larger
     
-    async def perform_mass_unban(self, ctx: commands.Context, banned_users: dict) -> tuple[int, int]:
-        """Helper function to perform mass unban with progress tracking"""
-        # Count only actual user IDs (exclude special keys that start with underscore)
-        total_users = len([user_id for user_id in banned_users.keys() if not user_id.startswith('_')])
-        unbanned_count = 0
-        failed_count = 0
-        processed_count = 0
+    def unban_job_running(self, guild_id: int) -> bool:
+        """Whether a server has a mass unban running, or persisted and waiting to be resumed"""
+        return guild_id in self.unban_jobs or guild_id in self.store.get_unban_jobs()
+    
+    async def perform_mass_unban(self, ctx: commands.Context, user_ids: list[int], reason: str = None,
+                                 progress_text: str = None, kind: str = 'endgame') -> tuple[int, int] | None:
+        """Start a persisted mass unban job and run it with progress tracking, returns None without starting
+        if the server already has one (a server has a single job record, a second run would overwrite it)"""
+        if self.unban_job_running(ctx.guild.id):
+            return None
+        job = UnbanJob(kind, reason or f"Game ended by {ctx.author.name}", ctx.author.name, ctx.channel.id, len(user_ids))
+        self.unban_jobs[ctx.guild.id] = job
+        self.store.save_unban_job(ctx.guild.id, job.to_json())
+        return await self.run_unban_job(ctx.guild, ctx.channel, job, user_ids, progress_text)
+    
+    async def run_unban_job(self, guild: discord.Guild, channel, job: UnbanJob, user_ids: list[int],
+                            progress_text: str = None) -> tuple[int, int]:
+        """Unban users with the shared unban engine, persisting removals and job progress every batch"""
+        self.unban_jobs[guild.id] = job
+        batch_size = max(1, self.config['unban_batch_size'])
+        unbanned_ids = []
         
         # Calculate progress increment based on total users
-        progress_increment = self.get_progress_increment(total_users)
+        progress_increment = self.get_progress_increment(job.total)
         
         # Send initial progress message
-        progress_msg = await ctx.send(f"Unbanning {total_users} users... Progress: 0/{total_users} processed...")
-        
-        banned_users_list = list(banned_users.items())
+        progress_msg = None
+        if channel:
+            progress_msg = await channel.send(progress_text or f"Unbanning {job.total} users... Progress: {job.processed}/{job.total} processed...")
+        
+        def checkpoint() -> None:
+            # Removals and the job cursor are written together, a restart resumes from here
+            if unbanned_ids:
+                self.remove_banned_users(guild.id, list(unbanned_ids))
+                unbanned_ids.clear()
+            self.store.save_unban_job(guild.id, job.to_json())
+        
+        def on_result(user_id: int, unbanned: bool) -> None:
+            job.processed += 1
+            if unbanned:
+                job.unbanned += 1
+                unbanned_ids.append(user_id)
+            else:
+                job.failed += 1
+                job.failed_ids.append(user_id)
+            if job.processed % batch_size == 0:
+                checkpoint()
         
-        for i, (user_id_str, user_info) in enumerate(banned_users_list):
-            # Skip special keys that start with underscore (like '_logged_checkpoints')
-            if user_id_str.startswith('_'):
-                continue
-            user_id = int(user_id_str)
-            processed_count += 1
-            
-            retry_count = 0
-            max_retries = 3
-            success = False
-            
-            while retry_count < max_retries and not success:
-                try:
-                    ban_entry = await ctx.guild.fetch_ban(discord.Object(id=user_id))
-                    await ctx.guild.unban(ban_entry.user, reason=f"Game ended by {ctx.author.name}")
-                    self.remove_banned_user(ctx.guild.id, user_id)
-                    unbanned_count += 1
-                    success = True
-                    
-                except discord.NotFound:
-                    # User is not actually banned, remove from tracking
-                    self.remove_banned_user(ctx.guild.id, user_id)
-                    unbanned_count += 1  # Count as success since they're no longer banned
-                    success = True
-                    
-                except discord.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        retry_count += 1
-                        wait_time = min(retry_count * 5, 30)  # Progressive backoff, max 30 seconds
-                        await asyncio.sleep(wait_time)
-                    else:
-                        failed_count += 1
-                        success = True  # Don't retry for other HTTP errors
-                        
-                except discord.Forbidden:
-                    failed_count += 1
-                    success = True  # Don't retry for permission errors
-            
-            if not success:
-                failed_count += 1
-            
-            # Add delay between operations to avoid rate limiting (1.5 seconds)
-            await asyncio.sleep(1.5)
-            
+        async def on_progress(run) -> None:
             # Update progress based on calculated increment or on the last user
-            if processed_count % progress_increment == 0 or processed_count == total_users:
+            if progress_msg and (run.processed % progress_increment == 0 or run.processed == run.total):
                 try:
-                    await progress_msg.edit(content=f"Progress: {processed_count}/{total_users} processed... (Unbanned: {unbanned_count}, Failed: {failed_count})")
+                    await progress_msg.edit(content=f"Progress: {job.processed}/{job.total} processed... (Unbanned: {job.unbanned}, Failed: {job.failed})")
                 except discord.HTTPException:
                     # If we can't edit the progress message, continue anyway
                     pass
         
-        return unbanned_count, failed_count
+        try:
+            await self.unban_engine.unban_all(guild, user_ids, job.reason, on_result=on_result, on_progress=on_progress)
+        finally:
+            checkpoint()
+            self.unban_jobs.pop(guild.id, None)
+        
+        self.store.delete_unban_job(guild.id)
+        return job.unbanned, job.failed
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pick up mass unban jobs interrupted by a restart and check the tracked bans against Discord"""
+        if self.started_up:
+            return  # on_ready fires again after reconnects
+        self.started_up = True
+        
+        jobs = self.store.get_unban_jobs()
+        for guild_id, data in jobs.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            asyncio.create_task(self.resume_unban_job(guild, UnbanJob.from_json(data)))
+        
+        if self.config['reconcile_on_startup'] in ('report', 'fix'):
+            # Chosen from the store's index of servers, so idle servers are never loaded
+            tracked = self.store.get_tracked_guild_ids()
+            guilds = [guild for guild in self.bot.guilds if guild.id in tracked and guild.id not in jobs]
+            if guilds:
+                asyncio.create_task(self.reconcile_on_startup(guilds))
+    
+    async def reconcile_on_startup(self, guilds: list[discord.Guild]) -> None:
+        """Startup task: reconcile one server at a time so ban list pagination never runs in parallel"""
+        fix = self.config['reconcile_on_startup'] == 'fix'
+        for guild in guilds:
+            try:
+                await self.reconcile(guild, fix)
+            except discord.HTTPException as e:
+                print(f"❌ [CONSOLE] Failed to reconcile bans in {guild.name}: {e}")
+    
+    async def reconcile(self, guild: discord.Guild, fix: bool = False) -> ReconcileResult:
+        """Compare the tracked bans with the server's ban list, and optionally bring the tracking in line"""
+        await self.store.load(guild.id)
+        result = await reconcile_bans(guild, IdSet(self.get_banned_user_ids(guild.id)))
+        
+        if fix:
+            async with self.guild_lock(guild.id):
+                self.apply_reconcile(guild, result)
+        
+        status = "in sync" if result.in_sync else f"{len(result.stale)} stale, {len(result.untracked)} untracked"
+        print(f"🔍 [CONSOLE] Reconciled bans in {guild.name}: {result.scanned} bans vs {result.tracked} tracked - {status}{' (fixed)' if fix and not result.in_sync else ''}")
+        return result
+    
+    def apply_reconcile(self, guild: discord.Guild, result: ReconcileResult) -> None:
+        """Bring the tracking in line with the ban list (call with the guild lock held)"""
+        # Bans and unbans may have happened while the ban list was being read, re-check against the store
+        stale = [user_id for user_id in result.stale if self.store.is_banned(guild.id, user_id)]
+        if stale:
+            self.remove_banned_users(guild.id, stale)
+        untracked = {}
+        for user_id, username, banned_by in result.untracked:
+            if not self.store.is_banned(guild.id, user_id):
+                untracked.setdefault(banned_by, []).append((user_id, username))
+        for banned_by, users in untracked.items():
+            self.save_banned_users(guild.id, users, banned_by)
+    
+    async def resume_unban_job(self, guild: discord.Guild, job: UnbanJob) -> None:
+        """Continue an interrupted mass unban with whoever is still tracked as banned"""
+        await self.store.load(guild.id)
+        failed_ids = set(job.failed_ids)
+        user_ids = [user_id for user_id in self.get_banned_user_ids(guild.id) if user_id not in failed_ids]
+        job.total = job.processed + len(user_ids)
+        print(f"♻️ [CONSOLE] Resuming {job.kind} unban job in {guild.name} - {len(user_ids)} users left")
+        
+        channel = self.bot.get_channel(job.channel_id)
+        unbanned_count, failed_count = await self.run_unban_job(
+            guild,
+            channel,
+            job,
+            user_ids,
+            progress_text=f"♻️ Resuming the mass unban after a restart... Progress: {job.processed}/{job.total} processed..."
+        )
+        
+        if job.kind == 'endgame':
+            # The rest of !endgame: spectators and game state
+            await self.clear_spectator_roles(guild)
+            self.reset_game_state(guild.id)
+            await self.store.flush()
+        
+        if channel:
+            await channel.send(f"Resumed unban complete! Successfully unbanned **{unbanned_count}** users. Failed: **{failed_count}** users.")
+        self.send(
+            self.setting(guild.id, 'ban_logs'),
+            f"♻️ Resumed mass unban (started by {job.requested_by}) finished! Unbanned: {unbanned_count}, Failed: {failed_count}",
+            priority=Priority.CHECKPOINT
+        )
 
 # Run the bot
-if __name__ == "__main__":
+def run() -> None:
     # Get bot token from environment variables
     token = os.getenv('DISCORD_TOKEN')
     if not token:
@@ -611,4 +956,7 @@ if __name__ == "__main__":
         print("Error: Invalid token provided!")
         print("Please check your DISCORD_TOKEN in the .env file.")
     except Exception as e:
-        print(f"Error starting bot: {e}")
\ No newline at end of file
+        print(f"Error starting bot: {e}")
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
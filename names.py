@@ -0,0 +1,78 @@
+from bisect import bisect_left, insort
+
+import discord
+
+
+def member_names(member: discord.Member) -> tuple[str, ...]:
+    """Every name a member can be targeted by: username, global display name and server nickname"""
+    names = [member.name]
+    if member.global_name:
+        names.append(member.global_name)
+    if member.nick:
+        names.append(member.nick)
+    return tuple(dict.fromkeys(names))
+
+
+class NameIndex:
+    """Sorted (casefolded name, user ID, name) entries for one server, for exact lookups and prefix completion
+    with bisect instead of scanning every member"""
+
+    def __init__(self, members=()):
+        self.entries = []  # sorted [(key, user_id, name)]
+        self.names = {}  # {user_id: names currently indexed}
+        for member in members:
+            if not member.bot:
+                self.names[member.id] = member_names(member)
+        self.entries = sorted(
+            (name.casefold(), user_id, name) for user_id, names in self.names.items() for name in names
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, member: discord.Member) -> None:
+        """Index a member, replacing whatever names they were indexed under before"""
+        if member.bot:
+            return
+        self.remove(member.id)
+        names = self.names[member.id] = member_names(member)
+        for name in names:
+            insort(self.entries, (name.casefold(), member.id, name))
+
+    def remove(self, user_id: int) -> None:
+        for name in self.names.pop(user_id, ()):
+            index = bisect_left(self.entries, (name.casefold(), user_id, name))
+            if index < len(self.entries) and self.entries[index][1] == user_id:
+                del self.entries[index]
+
+    def prefix_matches(self, prefix: str):
+        """Yield (user_id, name) for every indexed name starting with the prefix, in name order"""
+        key = prefix.casefold()
+        index = bisect_left(self.entries, (key,))
+        while index < len(self.entries) and self.entries[index][0].startswith(key):
+            _, user_id, name = self.entries[index]
+            yield user_id, name
+            index += 1
+
+    def resolve(self, query: str, allowed=None) -> int | None:
+        """Find the user an exact (case-insensitive) name refers to, only among `allowed` IDs if given"""
+        key = query.casefold()
+        for user_id, name in self.prefix_matches(query):
+            if name.casefold() != key:
+                break  # exact matches sort before longer names sharing the prefix
+            if allowed is None or user_id in allowed:
+                return user_id
+        return None
+
+    def complete(self, prefix: str, allowed=None, limit: int = 25) -> list[tuple[int, str]]:
+        """Up to `limit` distinct users whose names start with the prefix"""
+        seen = set()
+        matches = []
+        for user_id, name in self.prefix_matches(prefix):
+            if user_id in seen or (allowed is not None and user_id not in allowed):
+                continue
+            seen.add(user_id)
+            matches.append((user_id, name))
+            if len(matches) >= limit:
+                break
+        return matches
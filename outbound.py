@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+
+import discord
+
+MESSAGE_LIMIT = 2000
+
+
+class Priority(IntEnum):
+    """Outbound traffic classes, lower values are sent first"""
+    WIN = 0
+    CHECKPOINT = 1
+    BAN = 2
+    FAILED = 3
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` sends in a burst, refilled at `rate` per second"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class Outgoing:
+    """A queued message or reaction"""
+    __slots__ = ('priority', 'channel', 'content', 'embed', 'view', 'merge', 'message', 'emoji')
+
+    def __init__(self, priority: Priority, channel=None, content=None, embed=None, view=None,
+                 merge=False, message=None, emoji=None):
+        self.priority = priority
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.merge = merge  # plain text that may be joined with other queued lines of the same priority
+        self.message = message  # set for reactions
+        self.emoji = emoji
+
+
+class OutboundDispatcher:
+    """Single path for game announcements: a priority queue and token bucket per channel, shedding low priority
+    traffic when a channel backs up"""
+
+    def __init__(self, rate: float = 1.0, burst: int = 5, max_queue: int = 50):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.queues = {}  # {route: heap of (priority, seq, Outgoing)}
+        self.buckets = {}  # {route: TokenBucket}
+        self.workers = {}  # {route: asyncio.Task}
+        self.sequence = itertools.count()
+        self.dropped = 0
+        self.merged = 0
+
+    def send(self, channel, content: str = None, *, embed: discord.Embed = None, view: discord.ui.View = None,
+             priority: Priority = Priority.BAN, merge: bool = False) -> None:
+        """Queue a message for a channel"""
+        if channel is None:
+            return
+        item = Outgoing(priority, channel=channel, content=content, embed=embed, view=view,
+                        merge=merge and embed is None and view is None)
+        self.enqueue(channel.id, item)
+
+    def react(self, message: discord.Message, emoji, priority: Priority = Priority.BAN) -> None:
+        """Queue a reaction, reactions have their own bucket per channel"""
+        self.enqueue(('reaction', message.channel.id), Outgoing(priority, message=message, emoji=emoji))
+
+    def enqueue(self, route, item: Outgoing) -> None:
+        queue = self.queues.setdefault(route, [])
+        if len(queue) >= self.max_queue and not self.make_room(queue, item):
+            self.dropped += 1
+            return
+
+        heapq.heappush(queue, (item.priority, next(self.sequence), item))
+        worker = self.workers.get(route)
+        if worker is None or worker.done():
+            self.workers[route] = asyncio.create_task(self.drain(route, queue))
+
+    def make_room(self, queue: list, item: Outgoing) -> bool:
+        """Drop policy for a full queue: evict the newest entry of the lowest class if that is below the new item,
+        refuse new ban/failed traffic otherwise, and never refuse win or checkpoint announcements"""
+        worst = max(range(len(queue)), key=lambda index: (queue[index][0], queue[index][1]))
+        if queue[worst][0] > item.priority and queue[worst][0] >= Priority.BAN:
+            queue[worst] = queue[-1]
+            queue.pop()
+            heapq.heapify(queue)
+            self.dropped += 1
+            return True
+        return item.priority < Priority.BAN
+
+    def take_merged(self, queue: list, item: Outgoing) -> Outgoing:
+        """Merge policy: fold other queued mergeable lines of the same class and channel into one message"""
+        lines = [item.content]
+        length = len(item.content)
+        while queue:
+            priority, _, following = queue[0]
+            if priority != item.priority or not following.merge:
+                break
+            if length + 1 + len(following.content) > MESSAGE_LIMIT:
+                break
+            heapq.heappop(queue)
+            lines.append(following.content)
+            length += 1 + len(following.content)
+            self.merged += 1
+        if len(lines) > 1:
+            item.content = "\n".join(lines)
+        return item
+
+    async def drain(self, route, queue: list) -> None:
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            bucket = self.buckets[route] = TokenBucket(self.rate, self.burst)
+
+        while queue:
+            wait = bucket.delay()
+            if wait > 0:
+                # Re-check the queue afterwards, something more urgent may have arrived
+                await asyncio.sleep(wait)
+                continue
+
+            _, _, item = heapq.heappop(queue)
+            if item.merge:
+                item = self.take_merged(queue, item)
+            bucket.take()
+            try:
+                if item.message is not None:
+                    await item.message.add_reaction(item.emoji)
+                else:
+                    await item.channel.send(item.content, embed=item.embed, view=item.view)
+            except discord.HTTPException as e:
+                print(f"❌ [CONSOLE] Failed to send queued {item.priority.name.lower()} message: {e}")
+
+    def close(self) -> None:
+        for worker in self.workers.values():
+            worker.cancel()
+        self.workers.clear()
+        self.queues.clear()
+
+
+class BanDigest:
+    """Adaptive batching of ban announcements: above `threshold` bans per minute they are buffered per server
+    and published together every `interval` seconds, below it they go out one by one again"""
+
+    def __init__(self, publish, threshold: float = 30, interval: float = 5.0, window: float = 15.0):
+        self.publish = publish  # async (guild_id, entries) -> None
+        self.threshold = threshold
+        self.interval = interval
+        self.window = window
+        self.recent = {}  # {guild_id: deque of ban timestamps inside the window}
+        self.buffers = {}  # {guild_id: list of buffered entries}
+        self.workers = {}  # {guild_id: asyncio.Task}
+
+    def rate(self, guild_id: int) -> float:
+        """Bans per minute over the last window"""
+        recent = self.recent.get(guild_id)
+        if not recent:
+            return 0
+        cutoff = time.monotonic() - self.window
+        while recent and recent[0] < cutoff:
+            recent.popleft()
+        return len(recent) * 60 / self.window
+
+    def offer(self, guild_id: int, entry) -> bool:
+        """Record a ban, returns True if its announcement was buffered for the next digest"""
+        self.recent.setdefault(guild_id, deque()).append(time.monotonic())
+        if self.threshold <= 0:
+            return False
+
+        buffer = self.buffers.get(guild_id)
+        # Keep buffering while a digest is pending so announcements never overtake earlier ones
+        if not buffer and self.rate(guild_id) < self.threshold:
+            return False
+
+        self.buffers.setdefault(guild_id, []).append(entry)
+        worker = self.workers.get(guild_id)
+        if worker is None or worker.done():
+            self.workers[guild_id] = asyncio.create_task(self.flush_periodically(guild_id))
+        return True
+
+    async def flush_periodically(self, guild_id: int) -> None:
+        while self.buffers.get(guild_id):
+            await asyncio.sleep(self.interval)
+            entries = self.buffers.pop(guild_id, None)
+            if entries:
+                try:
+                    await self.publish(guild_id, entries)
+                except Exception as e:
+                    print(f"❌ [CONSOLE] Failed to publish ban digest for guild {guild_id}: {e}")
+
+    def cancel(self, guild_id: int) -> None:
+        worker = self.workers.pop(guild_id, None)
+        if worker is not None:
+            worker.cancel()
+        self.buffers.pop(guild_id, None)
+        self.recent.pop(guild_id, None)
+
+    def close(self) -> None:
+        for guild_id in list(self.workers):
+            self.cancel(guild_id)
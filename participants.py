@@ -0,0 +1,200 @@
+import discord
+
+from idsets import IdSet
+
+
+class RoleHierarchy:
+    """A server's bot role position and the role IDs that rule a member out, cached until roles change"""
+    __slots__ = ('bot_top_role_position', 'excluded_role_ids')
+
+    def __init__(self, guild: discord.Guild, bot_master_role_id: int):
+        bot_member = guild.me
+        self.bot_top_role_position = bot_member.top_role.position if bot_member else 0
+        # Bot masters, plus every role at or above the bot's top role
+        self.excluded_role_ids = {role.id for role in guild.roles if role.position >= self.bot_top_role_position}
+        self.excluded_role_ids.add(bot_master_role_id)
+
+
+def member_role_ids(member: discord.Member) -> list[int]:
+    """A member's role IDs, through the public Member.roles (the raw ID list discord.py keeps is private)"""
+    return [role.id for role in member.roles]
+
+
+def has_eligible_roles(role_ids, hierarchy: RoleHierarchy) -> bool:
+    """Check a non-bot member's role IDs against the hierarchy (not a bot master, not at or above the bot's role)"""
+    # Everyone has @everyone at position 0, so if the bot isn't above that nobody is below the bot
+    if hierarchy.bot_top_role_position <= 0:
+        return False
+
+    # Skip bot masters and users with roles above the bot
+    return hierarchy.excluded_role_ids.isdisjoint(role_ids)
+
+
+def is_eligible(member: discord.Member, hierarchy: RoleHierarchy) -> bool:
+    """Check whether a member can take part in the game (not a bot, not a bot master, not at or above the bot's role)"""
+    # Skip bots
+    if member.bot:
+        return False
+
+    return has_eligible_roles(member_role_ids(member), hierarchy)
+
+
+class GuildParticipants:
+    """Eligible, banned and remaining participant IDs for one server"""
+
+    def __init__(self, eligible: IdSet, banned: IdSet, member_roles: dict | None = None):
+        self.eligible = eligible
+        self.banned = banned
+        self.remaining = eligible - banned
+        # Large guild mode only: {user_id: role ID tuple} for non-bot members, standing in for the member cache
+        self.member_roles = member_roles
+
+
+class ParticipantIndex:
+    """Per-server participant sets, built once from the member list and then kept current from gateway events"""
+
+    def __init__(self, bot_master_role_id: int, load_banned_ids, large_guild_mode: bool = False):
+        self.bot_master_role_id = bot_master_role_id
+        self.load_banned_ids = load_banned_ids  # guild_id -> iterable of tracked banned user IDs
+        # No member cache to build from: servers are loaded from an explicit chunk and keep role IDs per member
+        self.large_guild_mode = large_guild_mode
+        self.guilds = {}  # {guild_id: GuildParticipants}
+        self.hierarchies = {}  # {guild_id: RoleHierarchy}
+        self.versions = {}  # {guild_id: counter bumped on every change to that server's sets}
+
+    def version(self, guild_id: int) -> int:
+        """Current change counter for a server, anything derived from its sets is stale once this moves"""
+        return self.versions.get(guild_id, 0)
+
+    def bump(self, guild_id: int) -> None:
+        self.versions[guild_id] = self.versions.get(guild_id, 0) + 1
+
+    def hierarchy(self, guild: discord.Guild) -> RoleHierarchy:
+        """Get a server's cached role hierarchy, computed once per role change"""
+        hierarchy = self.hierarchies.get(guild.id)
+        if hierarchy is None:
+            hierarchy = self.hierarchies[guild.id] = RoleHierarchy(guild, self.bot_master_role_id)
+        return hierarchy
+
+    def is_loaded(self, guild_id: int) -> bool:
+        return guild_id in self.guilds
+
+    def get(self, guild: discord.Guild) -> GuildParticipants:
+        """Get a server's participant sets, building them with one pass over the member list on first use"""
+        participants = self.guilds.get(guild.id)
+        if participants is None:
+            # Nothing cached to build from in large guild mode, the server must be chunked and passed to build() first
+            if self.large_guild_mode:
+                raise LookupError(f"Participants of guild {guild.id} aren't loaded")
+            participants = self.build(guild, guild.members)
+        return participants
+
+    def build(self, guild: discord.Guild, members) -> GuildParticipants:
+        """Build a server's sets from a member list (the member cache, or a one-off chunk in large guild mode)"""
+        self.bump(guild.id)
+        hierarchy = self.hierarchy(guild)
+        member_roles = {} if self.large_guild_mode else None
+        eligible = []
+        for member in members:
+            if member.bot:
+                continue
+            role_ids = member_role_ids(member)
+            if member_roles is not None:
+                member_roles[member.id] = tuple(role_ids)
+            if has_eligible_roles(role_ids, hierarchy):
+                eligible.append(member.id)
+
+        banned = IdSet(self.load_banned_ids(guild.id))
+        participants = self.guilds[guild.id] = GuildParticipants(IdSet(eligible), banned, member_roles)
+        return participants
+
+    def invalidate(self, guild: discord.Guild) -> None:
+        """Re-evaluate everyone after a role hierarchy change, which can affect any member"""
+        self.bump(guild.id)
+        self.hierarchies.pop(guild.id, None)
+        participants = self.guilds.get(guild.id)
+        if participants is None:
+            return
+
+        if participants.member_roles is None:
+            # Rebuilt from the member cache on next use
+            del self.guilds[guild.id]
+            return
+
+        # Large guild mode: no cache to rebuild from, so recompute from the role IDs kept at chunk time
+        hierarchy = self.hierarchy(guild)
+        participants.eligible = IdSet(
+            user_id for user_id, role_ids in participants.member_roles.items()
+            if has_eligible_roles(role_ids, hierarchy)
+        )
+        participants.remaining = participants.eligible - participants.banned
+
+    def reset_banned(self, guild_id: int) -> None:
+        """Forget every tracked ban for a server once its game state is reset"""
+        self.bump(guild_id)
+        participants = self.guilds.get(guild_id)
+        if participants is not None:
+            participants.banned = IdSet()
+            participants.remaining = participants.eligible.copy()
+
+    def forget(self, guild_id: int) -> None:
+        """Drop a server's sets entirely, e.g. to release a large guild's member data once its game is over"""
+        self.bump(guild_id)
+        self.guilds.pop(guild_id, None)
+        self.hierarchies.pop(guild_id, None)
+
+    def member_joined(self, member: discord.Member) -> None:
+        self.member_updated(member)
+
+    def member_updated(self, member: discord.Member) -> None:
+        """Re-evaluate a single member after they joined or their roles changed"""
+        participants = self.guilds.get(member.guild.id)
+        if participants is None or member.bot:
+            return  # Not built yet, the first build will see this member
+
+        if participants.member_roles is not None:
+            participants.member_roles[member.id] = tuple(member_role_ids(member))
+
+        eligible = is_eligible(member, self.hierarchy(member.guild))
+        if eligible == (member.id in participants.eligible):
+            return  # Same sets as before, cached progress stays valid
+        self.bump(member.guild.id)
+        if eligible:
+            participants.eligible.add(member.id)
+            if member.id not in participants.banned:
+                participants.remaining.add(member.id)
+        else:
+            participants.eligible.discard(member.id)
+            participants.remaining.discard(member.id)
+
+    def member_left(self, guild_id: int, user_id: int) -> None:
+        self.bump(guild_id)
+        participants = self.guilds.get(guild_id)
+        if participants is not None:
+            participants.eligible.discard(user_id)
+            participants.remaining.discard(user_id)
+            if participants.member_roles is not None:
+                participants.member_roles.pop(user_id, None)
+
+    def mark_banned(self, guild_id: int, user_id: int) -> None:
+        self.bump(guild_id)
+        participants = self.guilds.get(guild_id)
+        if participants is not None:
+            participants.banned.add(user_id)
+            participants.remaining.discard(user_id)
+
+    def mark_banned_many(self, guild_id: int, user_ids) -> None:
+        self.bump(guild_id)
+        participants = self.guilds.get(guild_id)
+        if participants is not None:
+            newly_banned = IdSet(user_ids)
+            participants.banned.update(newly_banned)
+            participants.remaining = participants.remaining.difference(newly_banned)
+
+    def mark_unbanned_many(self, guild_id: int, user_ids) -> None:
+        self.bump(guild_id)
+        participants = self.guilds.get(guild_id)
+        if participants is not None:
+            unbanned = IdSet(user_ids)
+            participants.banned = participants.banned.difference(unbanned)
+            participants.remaining.update(user_id for user_id in unbanned if user_id in participants.eligible)
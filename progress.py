@@ -0,0 +1,53 @@
+import asyncio
+
+
+class ProgressSnapshot:
+    """Game progress for one server, valid for as long as the server's participant version is unchanged"""
+    __slots__ = ('version', 'effective_count', 'banned_count', 'remaining_count', 'status_embed')
+
+    def __init__(self, version: int, effective_count: int, banned_count: int, remaining_count: int):
+        self.version = version
+        self.effective_count = effective_count
+        self.banned_count = banned_count
+        self.remaining_count = remaining_count
+        self.status_embed = None  # rendered !remaining embed, filled in lazily and shared by every caller
+
+    @property
+    def percentage_remaining(self) -> float:
+        return (self.remaining_count / self.effective_count) * 100 if self.effective_count > 0 else 0
+
+    @property
+    def percentage_banned(self) -> float:
+        return (self.banned_count / self.effective_count) * 100 if self.effective_count > 0 else 0
+
+
+class ProgressCache:
+    """Latest snapshot per server, recomputed once per version with concurrent callers sharing the computation"""
+
+    def __init__(self):
+        self.snapshots = {}  # {guild_id: ProgressSnapshot}
+        self.pending = {}  # {guild_id: (version, task)}
+
+    async def get(self, guild_id: int, version: int, compute) -> ProgressSnapshot:
+        """Return the cached snapshot for this version, or join/start the one in-flight computation of it"""
+        snapshot = self.snapshots.get(guild_id)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        pending = self.pending.get(guild_id)
+        if pending is None or pending[0] != version:
+            task = asyncio.ensure_future(compute())
+            pending = self.pending[guild_id] = (version, task)
+            task.add_done_callback(lambda done: self.finished(guild_id, version, done))
+
+        # Shield so one caller being cancelled doesn't cancel the computation everyone else is waiting on
+        return await asyncio.shield(pending[1])
+
+    def finished(self, guild_id: int, version: int, task: asyncio.Task) -> None:
+        if self.pending.get(guild_id, (None, None))[1] is task:
+            del self.pending[guild_id]
+        if task.cancelled() or task.exception() is not None:
+            return
+        current = self.snapshots.get(guild_id)
+        if current is None or current.version <= version:
+            self.snapshots[guild_id] = task.result()
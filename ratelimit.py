@@ -0,0 +1,51 @@
+import time
+from collections import deque
+
+
+class SlidingWindowLimiter:
+    """Per-key sliding window log: at most `burst` hits in any window of `burst / refill_rate` seconds"""
+
+    def __init__(self, burst: int, refill_rate: float):
+        self.burst = burst
+        self.window = burst / refill_rate if refill_rate > 0 else 0
+        self.hits = {}  # {key: deque of hit timestamps inside the window}
+        self.notified = set()  # keys already told they are limited in their current window
+        self.calls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.burst > 0 and self.window > 0
+
+    def check(self, key) -> tuple[bool, bool]:
+        """Record a hit, returns (allowed, notify) where notify is True only for the first rejected hit"""
+        if not self.enabled:
+            return True, False
+
+        now = time.monotonic()
+        cutoff = now - self.window
+        self.calls += 1
+        if self.calls % 1000 == 0:
+            self.prune(cutoff)
+
+        hits = self.hits.get(key)
+        if hits is None:
+            hits = self.hits[key] = deque()
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+        if len(hits) < self.burst:
+            hits.append(now)
+            self.notified.discard(key)
+            return True, False
+
+        if key in self.notified:
+            return False, False
+        self.notified.add(key)
+        return False, True
+
+    def prune(self, cutoff: float) -> None:
+        """Forget keys that have been idle for a whole window"""
+        idle = [key for key, hits in self.hits.items() if not hits or hits[-1] <= cutoff]
+        for key in idle:
+            del self.hits[key]
+            self.notified.discard(key)
@@ -0,0 +1,50 @@
+import discord
+
+from idsets import IdSet
+from storage import parse_ban_reason
+
+# Lowest possible snowflake, paginating with after= makes Discord return bans in ascending user ID order
+OLDEST_USER = discord.Object(id=0)
+
+
+class ReconcileResult:
+    """Differences between a server's tracked bans and its actual ban list"""
+    __slots__ = ('scanned', 'tracked', 'stale', 'untracked')
+
+    def __init__(self, tracked: int):
+        self.scanned = 0  # bans read from Discord
+        self.tracked = tracked
+        self.stale = []  # tracked as banned, but not banned any more (manual unbans)
+        self.untracked = []  # [(user_id, username, banned_by)], banned by the game but never recorded (crashes)
+
+    @property
+    def in_sync(self) -> bool:
+        return not self.stale and not self.untracked
+
+
+async def reconcile_bans(guild: discord.Guild, tracked: IdSet) -> ReconcileResult:
+    """Diff the tracked IDs against the server's ban list in one merge pass, streaming the bans page by page"""
+    result = ReconcileResult(len(tracked))
+    tracked_ids = tracked.ids
+    index = 0
+
+    async for entry in guild.bans(limit=None, after=OLDEST_USER):
+        user_id = entry.user.id
+        result.scanned += 1
+
+        # Both sides are in ascending ID order, anything tracked that the stream skipped past isn't banned
+        while index < len(tracked_ids) and tracked_ids[index] < user_id:
+            result.stale.append(tracked_ids[index])
+            index += 1
+
+        if index < len(tracked_ids) and tracked_ids[index] == user_id:
+            index += 1
+            continue
+
+        # Only bans the game made are ours to track, other moderators' bans are left alone
+        banned_by = parse_ban_reason(entry.reason)
+        if banned_by is not None:
+            result.untracked.append((user_id, entry.user.name, banned_by))
+
+    result.stale.extend(tracked_ids[index:])
+    return result
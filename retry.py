@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+
+import discord
+
+
+def retry_after_of(error: discord.HTTPException) -> float | None:
+    """Seconds Discord asked us to wait, if it said"""
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    headers = getattr(error.response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpen(discord.DiscordException):
+    """Raised instead of calling Discord while the circuit breaker is open"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Discord API unavailable, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Stops all API calls for `cooldown` seconds after `threshold` server errors in a row, then lets one
+    request through to probe whether Discord has recovered"""
+
+    PROBE_POLL = 1.0  # seconds callers are told to wait while the probe is out
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None  # monotonic time the circuit opened, None while closed
+        self.probe_started = None  # monotonic time the half open probe was let through, None without one
+
+    def check(self) -> None:
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        retry_in = self.opened_at + self.cooldown - now
+        if retry_in > 0:
+            raise CircuitOpen(retry_in)
+        # Half open: only one call probes, everyone else waits for its outcome. A probe that never reports
+        # back (its task was cancelled) is replaced after another cooldown
+        if self.probe_started is not None and now - self.probe_started < self.cooldown:
+            raise CircuitOpen(self.PROBE_POLL)
+        self.probe_started = now
+
+    def succeeded(self) -> None:
+        """Discord answered with something other than a server error, so it is up: close the circuit"""
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def failed(self) -> bool:
+        """Count a server error, returns True if this opened the circuit (again, for a failed probe)"""
+        self.failures += 1
+        probe_failed = self.probe_started is not None
+        if probe_failed or (self.threshold > 0 and self.failures >= self.threshold and self.opened_at is None):
+            self.opened_at = time.monotonic()
+            self.probe_started = None
+            return True
+        return False
+
+
+class RetryMetrics:
+    """Counters of retried and abandoned API calls, per operation"""
+
+    def __init__(self):
+        self.retries = {}  # {operation: retries}
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.gave_up = 0
+        self.circuit_opened = 0
+        self.rejected = 0  # calls refused while the circuit was open
+
+    def record_retry(self, operation: str, rate_limited: bool) -> None:
+        self.retries[operation] = self.retries.get(operation, 0) + 1
+        if rate_limited:
+            self.rate_limited += 1
+        else:
+            self.server_errors += 1
+
+    @property
+    def total_retries(self) -> int:
+        return sum(self.retries.values())
+
+    def summary(self) -> str:
+        if not self.total_retries and not self.gave_up and not self.rejected:
+            return "None"
+        by_operation = ", ".join(f"{operation} {count}" for operation, count in sorted(self.retries.items()))
+        return (f"{self.total_retries} retries ({by_operation or 'none'}), {self.rate_limited} rate limited, "
+                f"{self.server_errors} server errors, {self.gave_up} gave up, circuit opened {self.circuit_opened}x")
+
+
+class RetryPolicy:
+    """Single retry policy for Discord API calls: rate limits wait out Discord's retry_after (plus jitter), server
+    errors back off exponentially and trip the circuit breaker, everything else fails immediately"""
+
+    def __init__(self, deadline: float = 30.0, max_attempts: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 30.0, jitter: float = 0.2, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.metrics = RetryMetrics()
+
+    def backoff(self, attempt: int, error: discord.HTTPException) -> float:
+        delay = retry_after_of(error) if is_rate_limit(error) else None
+        if delay is None:
+            delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        # Jitter on top, never below what Discord asked for
+        return delay * (1 + random.uniform(0, self.jitter))
+
+    async def call(self, operation: str, request, on_retry=None):
+        """Await request() until it succeeds, a non-retryable error occurs, or the attempts or deadline run out
+        (the last error is raised). on_retry(error, delay) is called before each retry"""
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                self.breaker.check()
+            except CircuitOpen:
+                self.metrics.rejected += 1
+                raise
+
+            attempt += 1
+            try:
+                result = await request()
+            except (discord.RateLimited, discord.HTTPException) as e:
+                rate_limited = is_rate_limit(e)
+                if rate_limited or not is_server_error(e):
+                    self.breaker.succeeded()  # Discord answered, so it is up (this matters for the probe)
+                if not rate_limited and not is_server_error(e):
+                    raise  # Forbidden, NotFound and other client errors won't get better by retrying
+                if not rate_limited and self.breaker.failed():
+                    self.metrics.circuit_opened += 1
+                    print(f"🔌 [CONSOLE] Circuit breaker opened after {self.breaker.failures} Discord server errors, pausing API calls for {self.breaker.cooldown:.0f}s")
+
+                delay = self.backoff(attempt, e)
+                if attempt >= self.max_attempts or time.monotonic() + delay > give_up_at:
+                    self.metrics.gave_up += 1
+                    print(f"❌ [CONSOLE] Giving up on {operation} after {attempt} attempts: {e}")
+                    raise
+                self.metrics.record_retry(operation, rate_limited)
+                if on_retry is not None:
+                    on_retry(e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.succeeded()
+            return result
+
+
+def is_rate_limit(error: Exception) -> bool:
+    return isinstance(error, discord.RateLimited) or getattr(error, 'status', None) == 429
+
+
+def is_server_error(error: Exception) -> bool:
+    return isinstance(error, discord.DiscordServerError) or getattr(error, 'status', 0) >= 500
@@ -0,0 +1,255 @@
+import asyncio
+
+import discord
+
+from idsets import IdSet
+from retry import CircuitOpen, RetryPolicy
+
+API_ERRORS = (discord.RateLimited, discord.HTTPException, CircuitOpen)
+
+
+class SpectatorManager:
+    """Spectator role and membership per server, cached so checks and teardown never scan the whole server"""
+
+    def __init__(self, role_name: str, api: RetryPolicy, removal_concurrency: int = 5, assign_rate: float = 5.0,
+                 dm_queue_size: int = 50, member_cache: bool = True):
+        self.role_name = role_name
+        self.api = api
+        # Without a member cache (large guild mode) role.members is empty and get_member always misses
+        self.member_cache = member_cache
+        self.removal_concurrency = removal_concurrency
+        self.assign_interval = 1 / assign_rate if assign_rate > 0 else 0
+        self.role_ids = {}  # {guild_id: spectator role ID}
+        self.spectators = {}  # {guild_id: IdSet of member IDs holding the role}
+        self.role_locks = {}  # {guild_id: asyncio.Lock}, so concurrent joiners can't create the role twice
+        # Mid-game joiners waiting for the role, drained by one worker per server
+        self.join_queues = {}  # {guild_id: asyncio.Queue of members}
+        self.join_workers = {}  # {guild_id: asyncio.Task}
+        # Welcome DMs are nice to have, so they get a bounded queue of their own and are dropped when it is full
+        self.dm_queue = asyncio.Queue(maxsize=dm_queue_size)
+        self.dm_worker = None
+        self.dropped_dms = 0
+
+    def find_role(self, guild: discord.Guild) -> discord.Role | None:
+        """Get the spectator role from the cached ID, falling back to a one-off lookup by name"""
+        role_id = self.role_ids.get(guild.id)
+        if role_id is not None:
+            role = guild.get_role(role_id)
+            if role is not None:
+                return role
+            self.forget(guild.id)
+
+        role = discord.utils.get(guild.roles, name=self.role_name)
+        if role is not None:
+            self.role_ids[guild.id] = role.id
+            # Role left over from before a restart, pick up who already has it (only known with a member cache,
+            # otherwise holders are recognised by their own roles in is_spectator)
+            self.spectators.setdefault(guild.id, IdSet()).update(member.id for member in role.members)
+        return role
+
+    def forget(self, guild_id: int) -> None:
+        self.role_ids.pop(guild_id, None)
+        self.spectators.pop(guild_id, None)
+
+    def is_spectator(self, member: discord.Member) -> bool:
+        guild = member.guild
+        if guild.id not in self.spectators:
+            # First check since startup: look the role up once and remember its holders (or that there is none)
+            if self.find_role(guild) is None:
+                self.spectators[guild.id] = IdSet()
+        spectators = self.spectators[guild.id]
+        if member.id in spectators:
+            return True
+
+        # A holder the set doesn't know about (given the role before a restart without a member cache)
+        role_id = self.role_ids.get(guild.id)
+        if role_id is not None and member.get_role(role_id) is not None:
+            spectators.add(member.id)
+            return True
+        return False
+
+    async def get_or_create_role(self, guild: discord.Guild) -> discord.Role | None:
+        """Get or create the spectator role for the guild"""
+        role = self.find_role(guild)
+        if role is not None:
+            return role
+
+        lock = self.role_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            # Another joiner may have created it while we waited
+            role = self.find_role(guild)
+            if role is not None:
+                return role
+
+            try:
+                role = await self.api.call('create role', lambda: guild.create_role(
+                    name=self.role_name,
+                    color=discord.Color.gray(),
+                    reason="Ban Royale spectator role for mid-game joiners"
+                ))
+            except discord.Forbidden:
+                print(f"❌ [CONSOLE] Failed to create spectator role in {guild.name} - insufficient permissions")
+                return None
+            except API_ERRORS as e:
+                print(f"❌ [CONSOLE] Failed to create spectator role in {guild.name}: {e}")
+                return None
+
+            print(f"📋 [CONSOLE] Created spectator role '{self.role_name}' in {guild.name}")
+            self.role_ids[guild.id] = role.id
+            self.spectators.setdefault(guild.id, IdSet())
+            return role
+
+    async def add(self, member: discord.Member) -> bool:
+        """Give a member the spectator role, returns whether it was added"""
+        role = await self.get_or_create_role(member.guild)
+        if role is None:
+            return False
+
+        try:
+            await self.api.call('add role', lambda: member.add_roles(role, reason="Mid-game joiner - added to spectators"))
+        except API_ERRORS:
+            print(f"❌ [CONSOLE] Failed to add spectator role to {member.display_name}")
+            return False
+
+        self.spectators.setdefault(member.guild.id, IdSet()).add(member.id)
+        return True
+
+    def enqueue_join(self, member: discord.Member) -> None:
+        """Queue a mid-game joiner for the spectator role, so join bursts are handled at a steady rate"""
+        guild_id = member.guild.id
+        # Counts as a spectator right away, not only once the role has actually been assigned
+        self.spectators.setdefault(guild_id, IdSet()).add(member.id)
+        queue = self.join_queues.setdefault(guild_id, asyncio.Queue())
+        queue.put_nowait(member)
+
+        worker = self.join_workers.get(guild_id)
+        if worker is None or worker.done():
+            self.join_workers[guild_id] = asyncio.create_task(self.drain_joins(member.guild, queue))
+
+    async def drain_joins(self, guild: discord.Guild, queue: asyncio.Queue) -> None:
+        """Assign the spectator role to queued joiners, one request per assign interval"""
+        while True:
+            try:
+                member = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return  # enqueue_join starts a new worker for the next burst
+
+            if await self.add(member):
+                print(f"👀 [CONSOLE] Added spectator role to {member.display_name} (mid-game joiner) in {guild.name}")
+                self.enqueue_welcome(member)
+            await asyncio.sleep(self.assign_interval)
+
+    def enqueue_welcome(self, member: discord.Member) -> None:
+        try:
+            self.dm_queue.put_nowait(member)
+        except asyncio.QueueFull:
+            self.dropped_dms += 1
+            return
+
+        if self.dm_worker is None or self.dm_worker.done():
+            self.dm_worker = asyncio.create_task(self.send_welcomes())
+
+    async def send_welcomes(self) -> None:
+        """Low priority worker sending the spectator welcome DMs"""
+        while not self.dm_queue.empty():
+            member = self.dm_queue.get_nowait()
+            # Send a DM explaining they're a spectator
+            try:
+                await member.send(embed=self.welcome_embed(member.guild))
+            except discord.HTTPException:
+                pass  # Can't send DM, that's fine
+            await asyncio.sleep(self.assign_interval)
+
+    def welcome_embed(self, guild: discord.Guild) -> discord.Embed:
+        embed = discord.Embed(
+            title="🎭 Welcome to the Ban Royale!",
+            description=f"You joined **{guild.name}** during an active Ban Royale game.",
+            color=0x808080
+        )
+        embed.add_field(
+            name="👀 Spectator Status",
+            value="You've been assigned as a spectator since the game was already in progress.",
+            inline=False
+        )
+        embed.add_field(
+            name="🚫 Restrictions",
+            value="You cannot use `!ban` commands during this game.",
+            inline=False
+        )
+        embed.add_field(
+            name="⏰ Next Game",
+            value="You'll be able to participate when the next game starts!",
+            inline=False
+        )
+        return embed
+
+    def cancel_joins(self, guild_id: int) -> None:
+        """Drop anyone still waiting for the role, e.g. because the game ended"""
+        worker = self.join_workers.pop(guild_id, None)
+        if worker is not None:
+            worker.cancel()
+        self.join_queues.pop(guild_id, None)
+
+    def close(self) -> None:
+        for guild_id in list(self.join_workers):
+            self.cancel_joins(guild_id)
+        if self.dm_worker is not None:
+            self.dm_worker.cancel()
+
+    def member_updated(self, before: discord.Member, after: discord.Member) -> None:
+        """Track the role being added or removed by hand"""
+        role_id = self.role_ids.get(after.guild.id)
+        if role_id is None:
+            return
+        if after.get_role(role_id) is not None:
+            self.spectators.setdefault(after.guild.id, IdSet()).add(after.id)
+        else:
+            self.spectators.get(after.guild.id, IdSet()).discard(after.id)
+
+    async def teardown(self, guild: discord.Guild) -> None:
+        """Delete the spectator role, which takes it off every member in a single API call"""
+        self.cancel_joins(guild.id)
+        role = self.find_role(guild)
+        if role is None:
+            return
+
+        spectator_count = len(self.spectators.get(guild.id, ()))
+        try:
+            await self.api.call('delete role', lambda: role.delete(reason="Ban Royale game ended"))
+            self.forget(guild.id)
+            if spectator_count:
+                print(f"🗑️ [CONSOLE] Removed spectator role from {spectator_count} members in {guild.name}")
+            return
+        except API_ERRORS:
+            print(f"❌ [CONSOLE] Failed to delete spectator role in {guild.name}, removing it from members instead")
+
+        await self.remove_from_members(guild, role)
+
+    async def remove_from_members(self, guild: discord.Guild, role: discord.Role) -> None:
+        """Fallback teardown: take the role off each spectator with a bounded number of requests in flight"""
+        semaphore = asyncio.Semaphore(self.removal_concurrency)
+        spectator_ids = list(self.spectators.get(guild.id, ()))
+
+        async def remove(member_id: int) -> bool:
+            async with semaphore:
+                member = guild.get_member(member_id)
+                if member is None:
+                    if self.member_cache:
+                        return True  # Left the server, nothing to remove
+                    try:
+                        member = await self.api.call('fetch member', lambda: guild.fetch_member(member_id))
+                    except discord.NotFound:
+                        return True
+                    except API_ERRORS:
+                        print(f"❌ [CONSOLE] Failed to look up spectator {member_id} in {guild.name}")
+                        return False
+                try:
+                    await self.api.call('remove role', lambda: member.remove_roles(role, reason="Ban Royale game ended"))
+                    return True
+                except API_ERRORS:
+                    print(f"❌ [CONSOLE] Failed to remove spectator role from {member.display_name}")
+                    return False
+
+        results = await asyncio.gather(*(remove(member_id) for member_id in spectator_ids))
+        self.forget(guild.id)
+        print(f"🗑️ [CONSOLE] Removed spectator role from {sum(results)}/{len(spectator_ids)} members in {guild.name}")
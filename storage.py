@@ -0,0 +1,799 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class BanStore(ABC):
+    """Interface for persisting the users banned during an event, tracked separately per server"""
+
+    @abstractmethod
+    def get_banned_user_ids(self, guild_id: int) -> list[int]:
+        """Get the IDs of every user banned during the event in a server"""
+
+    @abstractmethod
+    def get_banned_count(self, guild_id: int) -> int:
+        """Get how many users were banned during the event in a server"""
+
+    @abstractmethod
+    def get_tracked_guild_ids(self) -> set[int]:
+        """Get the servers that may have tracked bans, without loading any of them"""
+
+    @abstractmethod
+    def is_banned(self, guild_id: int, user_id: int) -> bool:
+        """Check whether a user is tracked as banned in a server"""
+
+    @abstractmethod
+    def save_banned_user(self, guild_id: int, user_id: int, username: str, banned_by: str) -> None:
+        """Track a user banned during the event"""
+
+    @abstractmethod
+    def save_banned_users(self, guild_id: int, users: list[tuple[int, str]], banned_by: str) -> None:
+        """Track many users banned at once, as a single write"""
+
+    @abstractmethod
+    def remove_banned_user(self, guild_id: int, user_id: int) -> bool:
+        """Stop tracking a banned user, returns whether they were tracked"""
+
+    @abstractmethod
+    def remove_banned_users(self, guild_id: int, user_ids: list[int]) -> int:
+        """Stop tracking many banned users as a single write, returns how many were tracked"""
+
+    @abstractmethod
+    def get_logged_checkpoints(self, guild_id: int) -> list[int]:
+        """Get the decay checkpoints already logged for a server"""
+
+    @abstractmethod
+    def add_logged_checkpoint(self, guild_id: int, checkpoint: int) -> bool:
+        """Mark a decay checkpoint as logged, returns whether it was new"""
+
+    @abstractmethod
+    def reset_guild(self, guild_id: int) -> bool:
+        """Drop all tracking data for a server, returns whether there was any"""
+
+    @abstractmethod
+    def get_unban_jobs(self) -> dict[int, dict]:
+        """Get every persisted mass unban job, {guild_id: job}"""
+
+    @abstractmethod
+    def save_unban_job(self, guild_id: int, job: dict) -> None:
+        """Persist a server's mass unban job progress"""
+
+    @abstractmethod
+    def delete_unban_job(self, guild_id: int) -> None:
+        """Forget a server's mass unban job once it has finished"""
+
+    async def start(self) -> None:
+        """Start any background writer, called once the event loop is running"""
+
+    async def load(self, guild_id: int) -> None:
+        """Bring a server's data into memory without blocking the event loop, before it is first used"""
+
+    async def flush(self) -> None:
+        """Wait until every change made so far has been durably written"""
+
+    def compact(self) -> None:
+        """Periodic maintenance hook, called from a background task"""
+
+    def close(self) -> None:
+        """Persist anything outstanding and release resources"""
+
+
+def ban_reason(banned_by: str) -> str:
+    """The reason attached to a Ban Royale ban, derived from the banner rather than stored"""
+    return f"Ban Royale: Banned by {banned_by}"
+
+
+def parse_ban_reason(reason: str | None) -> str | None:
+    """Get the banner back out of a ban reason, or None if the ban wasn't made by Ban Royale"""
+    prefix = ban_reason("")
+    if not reason or not reason.startswith(prefix):
+        return None
+    return reason[len(prefix):]
+
+
+def durable(f) -> None:
+    """Push a file's writes to disk before it is renamed into place or the write is considered done"""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def parse_timestamp(value) -> int:
+    """Convert a stored banned_at (epoch seconds, or an ISO string from the original tracking file) to epoch seconds"""
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp())
+    return int(value)
+
+
+class BanRecord:
+    """A tracked ban, names are indexes into the owning server's name table"""
+    __slots__ = ('username_id', 'banned_by_id', 'banned_at')
+
+    def __init__(self, username_id: int, banned_by_id: int, banned_at: int):
+        self.username_id = username_id
+        self.banned_by_id = banned_by_id
+        self.banned_at = banned_at
+
+
+class GuildBans:
+    """One server's tracked bans in compact form: interned names, epoch timestamps and slotted records"""
+    __slots__ = ('names', 'name_ids', 'bans', 'logged_checkpoints')
+
+    def __init__(self):
+        self.names = []  # name table, BanRecord fields index into it
+        self.name_ids = {}  # {name: index into names}
+        self.bans = {}  # {user_id: BanRecord}
+        self.logged_checkpoints = []
+
+    def is_empty(self) -> bool:
+        return not self.bans and not self.logged_checkpoints
+
+    def intern(self, name: str) -> int:
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def add(self, user_id: int, username: str, banned_by: str, banned_at: int) -> None:
+        self.bans[user_id] = BanRecord(self.intern(username), self.intern(banned_by), banned_at)
+
+    def copy(self) -> 'GuildBans':
+        """Shallow copy, records are never mutated in place so this is a stable view for the writer thread"""
+        guild = GuildBans()
+        guild.names = self.names[:]
+        guild.name_ids = self.name_ids
+        guild.bans = self.bans.copy()
+        guild.logged_checkpoints = self.logged_checkpoints
+        return guild
+
+    def to_json(self) -> dict:
+        """Encode for disk, rebuilding the name table so names of unbanned users are dropped"""
+        names = []
+        name_ids = {}
+        bans = {}
+        for user_id, record in self.bans.items():
+            encoded = []
+            for name_id in (record.username_id, record.banned_by_id):
+                name = self.names[name_id]
+                if name not in name_ids:
+                    name_ids[name] = len(names)
+                    names.append(name)
+                encoded.append(name_ids[name])
+            encoded.append(record.banned_at)
+            bans[str(user_id)] = encoded
+        return {"version": 2, "names": names, "bans": bans, "logged_checkpoints": self.logged_checkpoints}
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'GuildBans':
+        """Decode a snapshot, including the original {user_id: {username, banned_by, ...}} layout"""
+        guild = cls()
+        if data.get("version") == 2:
+            guild.names = data["names"]
+            guild.name_ids = {name: name_id for name_id, name in enumerate(guild.names)}
+            guild.bans = {
+                int(user_id): BanRecord(username_id, banned_by_id, banned_at)
+                for user_id, (username_id, banned_by_id, banned_at) in data["bans"].items()
+            }
+            guild.logged_checkpoints = data["logged_checkpoints"]
+            return guild
+
+        for user_id, info in data.items():
+            if user_id == "_logged_checkpoints":
+                guild.logged_checkpoints = sorted(info)
+            else:
+                guild.add(int(user_id), info["username"], info["banned_by"], parse_timestamp(info["banned_at"]))
+        return guild
+
+
+class JsonBanStore(BanStore):
+    """Ban store sharded into one JSON snapshot plus append-only journal per server, loaded lazily into memory"""
+
+    def __init__(self, data_dir: str, journal_mode: bool = True, journal_compact_entries: int = 5000,
+                 legacy_path: str = None, flush_delay: float = 0.25):
+        self.data_dir = data_dir
+        self.journal_mode = journal_mode
+        self.journal_compact_entries = journal_compact_entries
+        self.flush_delay = flush_delay
+        # {guild_id_str: server entry}, a server's shard is only read the first time it is touched
+        self.shards = {}
+        # {guild_id_str: entries appended since that shard was last compacted}
+        self.journal_entries = {}
+        # Changes waiting for the background writer, coalesced per server
+        self.pending_lines = {}  # {guild_id_str: [journal lines]}
+        self.pending_snapshots = set()  # servers whose whole snapshot must be rewritten
+        self.pending_deletes = set()  # servers whose files must be removed
+        self.writer_task = None
+        self.wakeup = None
+        self.write_lock = None
+        os.makedirs(data_dir, exist_ok=True)
+        # Mass unban jobs get a file per server too, so clustered workers sharing data_dir never rewrite each
+        # other's jobs
+        self.unban_jobs = self.read_unban_jobs()  # {guild_id_str: job}
+        self.pending_jobs = set()  # servers whose job file must be rewritten (or removed)
+        if legacy_path:
+            self.migrate_legacy_file(legacy_path)
+
+    def job_path(self, guild_id_str: str) -> str:
+        return os.path.join(self.data_dir, f"{guild_id_str}.unban.json")
+
+    def read_unban_jobs(self) -> dict:
+        jobs = {}
+        for name in os.listdir(self.data_dir):
+            if not name.endswith(".unban.json"):
+                continue
+            guild_id_str = name[:-len(".unban.json")]
+            try:
+                with open(self.job_path(guild_id_str), 'r') as f:
+                    jobs[guild_id_str] = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return jobs
+
+    def write_unban_job(self, guild_id_str: str, job: dict | None) -> None:
+        path = self.job_path(guild_id_str)
+        if job is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(job, f, separators=(',', ':'))
+            durable(f)
+        os.replace(temp_path, path)
+
+    def snapshot_path(self, guild_id_str: str) -> str:
+        return os.path.join(self.data_dir, f"{guild_id_str}.json")
+
+    def journal_path(self, guild_id_str: str) -> str:
+        return os.path.join(self.data_dir, f"{guild_id_str}.journal")
+
+    def migrate_legacy_file(self, legacy_path: str) -> None:
+        """Split the original multi-server tracking file into per-server shards"""
+        try:
+            with open(legacy_path, 'r') as f:
+                all_data = json.load(f)
+        except FileNotFoundError:
+            return
+
+        guilds = {guild_id_str: GuildBans.from_json(guild_data) for guild_id_str, guild_data in all_data.items()}
+
+        for guild_id_str, guild in guilds.items():
+            if not guild.is_empty():
+                self.shards[guild_id_str] = guild
+                self.journal_entries[guild_id_str] = 0
+                self.write_snapshot(guild_id_str, guild)
+
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+        print(f"📦 [CONSOLE] Migrated {legacy_path} into {len(guilds)} per-server shards in {self.data_dir}/")
+
+    def shard(self, guild_id: int) -> GuildBans:
+        """Get a server's bans, reading them inline if load() didn't already"""
+        guild_id_str = str(guild_id)
+        guild = self.shards.get(guild_id_str)
+        if guild is None:
+            guild = self.install_shard(guild_id_str, *self.read_shard(guild_id_str))
+        return guild
+
+    async def load(self, guild_id: int) -> None:
+        guild_id_str = str(guild_id)
+        if guild_id_str in self.shards:
+            return
+        loaded = await asyncio.to_thread(self.read_shard, guild_id_str)
+        if guild_id_str not in self.shards:  # nobody read it inline while the thread ran
+            self.install_shard(guild_id_str, *loaded)
+
+    def install_shard(self, guild_id_str: str, guild: GuildBans, replayed: int) -> GuildBans:
+        self.shards[guild_id_str] = guild
+        self.journal_entries[guild_id_str] = replayed
+        return guild
+
+    def read_shard(self, guild_id_str: str) -> tuple[GuildBans, int]:
+        """Read a server's snapshot and replay its journal, returns the bans and how many entries were replayed"""
+        try:
+            with open(self.snapshot_path(guild_id_str), 'r') as f:
+                guild = GuildBans.from_json(json.load(f))
+        except FileNotFoundError:
+            guild = GuildBans()
+
+        replayed = 0
+        try:
+            with open(self.journal_path(guild_id_str), 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append, nothing after it was written
+                        break
+                    self.apply_entry(guild, entry)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return guild, replayed
+
+    def write_snapshot(self, guild_id_str: str, guild: GuildBans) -> None:
+        """Write a server's bans to its snapshot file"""
+        path = self.snapshot_path(guild_id_str)
+        # Write to a temp file first so a crash mid-write never leaves a truncated snapshot
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(guild.to_json(), f, separators=(',', ':'))
+            durable(f)
+        os.replace(temp_path, path)
+
+    def apply_entry(self, guild: GuildBans, entry: list) -> bool:
+        """Apply a single ban/unban/checkpoint journal entry to a server, returns whether anything changed"""
+        op = entry[0]
+
+        if op == 'b':
+            _, user_id, username, banned_by, banned_at = entry
+            guild.add(user_id, username, banned_by, banned_at)
+            return True
+
+        if op == 'u':
+            return guild.bans.pop(entry[1], None) is not None
+
+        if op == 'c':
+            if entry[1] in guild.logged_checkpoints:
+                return False
+            guild.logged_checkpoints = sorted(guild.logged_checkpoints + [entry[1]])
+            return True
+
+        raise ValueError(f"Unknown journal op: {op}")
+
+    def record_change(self, guild_id: int, entry: list) -> bool:
+        """Apply a change in memory and queue it for the writer (journal line, or shard rewrite when journal mode is off)"""
+        return self.record_changes(guild_id, [entry]) > 0
+
+    def record_changes(self, guild_id: int, entries: list[list]) -> int:
+        """Apply several changes and queue them as one write, returns how many changed anything"""
+        guild_id_str = str(guild_id)
+        guild = self.shard(guild_id)
+        applied = [entry for entry in entries if self.apply_entry(guild, entry)]
+        if not applied:
+            return 0
+
+        if not self.journal_mode:
+            self.pending_snapshots.add(guild_id_str)
+        else:
+            lines = self.pending_lines.setdefault(guild_id_str, [])
+            lines.extend(json.dumps(entry, separators=(',', ':')) + "\n" for entry in applied)
+            self.journal_entries[guild_id_str] += len(applied)
+            if self.journal_entries[guild_id_str] >= self.journal_compact_entries:
+                self.pending_snapshots.add(guild_id_str)
+                self.journal_entries[guild_id_str] = 0
+
+        self.schedule_write()
+        return len(applied)
+
+    async def start(self) -> None:
+        self.wakeup = asyncio.Event()
+        self.write_lock = asyncio.Lock()
+        self.writer_task = asyncio.create_task(self.writer_loop())
+
+    def has_pending(self) -> bool:
+        return bool(self.pending_lines or self.pending_snapshots or self.pending_deletes or self.pending_jobs)
+
+    def schedule_write(self) -> None:
+        """Wake the background writer, or write inline when it isn't running (scripts, tests)"""
+        if self.writer_task is None:
+            self.write_batch(self.take_batch())
+            return
+        self.wakeup.set()
+
+    async def writer_loop(self) -> None:
+        """Background writer: coalesces every change landing within flush_delay into one write per server"""
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(self.flush_delay)
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self.write_lock is None:
+            return
+        async with self.write_lock:
+            if not self.has_pending():
+                return
+            batch = self.take_batch()
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+            except OSError as e:
+                # Nothing in memory was lost, rewrite the affected servers in full on the next pass
+                deletes, snapshots, appends, jobs = batch
+                self.pending_deletes.update(deletes)
+                self.pending_snapshots.update(snapshots, appends)
+                self.pending_jobs.update(jobs)
+                print(f"❌ [CONSOLE] Failed to write ban store, will retry: {e}")
+                self.wakeup.set()
+
+    def take_batch(self) -> tuple[set, dict, dict, dict]:
+        """Grab everything pending; snapshots are shallow copies so the writer thread never sees later changes"""
+        snapshots = {guild_id_str: self.shards[guild_id_str].copy() for guild_id_str in self.pending_snapshots}
+        appends = {
+            guild_id_str: "".join(lines)
+            for guild_id_str, lines in self.pending_lines.items()
+            if guild_id_str not in snapshots  # a fresh snapshot already contains these changes
+        }
+        jobs = {guild_id_str: self.unban_jobs.get(guild_id_str) for guild_id_str in self.pending_jobs}  # None: job done
+        batch = (self.pending_deletes, snapshots, appends, jobs)
+        self.pending_deletes, self.pending_snapshots, self.pending_lines = set(), set(), {}
+        self.pending_jobs = set()
+        return batch
+
+    def write_batch(self, batch: tuple[set, dict, dict, dict]) -> None:
+        """Perform the blocking file I/O for a batch, runs in a worker thread"""
+        deletes, snapshots, appends, jobs = batch
+        for guild_id_str in deletes:
+            for path in (self.snapshot_path(guild_id_str), self.journal_path(guild_id_str)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        for guild_id_str, guild in snapshots.items():
+            # Snapshot first, truncate second: if we crash in between, replaying the
+            # journal over the new snapshot is harmless since every entry is idempotent
+            self.write_snapshot(guild_id_str, guild)
+            if self.journal_mode:
+                open(self.journal_path(guild_id_str), 'w').close()
+
+        for guild_id_str, text in appends.items():
+            with open(self.journal_path(guild_id_str), 'a') as f:
+                f.write(text)
+                durable(f)
+
+        # Job progress goes after the removals it describes, so a crash never leaves it ahead of them
+        for guild_id_str, job in jobs.items():
+            self.write_unban_job(guild_id_str, job)
+
+    def compact(self) -> None:
+        """Queue a fold of every non-empty journal into its snapshot"""
+        for guild_id_str, pending in self.journal_entries.items():
+            if pending:
+                self.pending_snapshots.add(guild_id_str)
+                self.journal_entries[guild_id_str] = 0
+        if self.pending_snapshots:
+            self.schedule_write()
+
+    def close(self) -> None:
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            self.writer_task = None
+        self.compact()
+        if self.has_pending():
+            self.write_batch(self.take_batch())
+
+    def get_banned_user_ids(self, guild_id: int) -> list[int]:
+        return list(self.shard(guild_id).bans)
+
+    def get_banned_count(self, guild_id: int) -> int:
+        return len(self.shard(guild_id).bans)
+
+    def get_tracked_guild_ids(self) -> set[int]:
+        # Loaded shards are current in memory, the others are known from their files alone
+        guild_ids = {int(guild_id_str) for guild_id_str, guild in self.shards.items() if guild.bans}
+        for name in os.listdir(self.data_dir):
+            guild_id_str, _, extension = name.partition(".")
+            if extension in ("json", "journal") and guild_id_str.isdigit() and guild_id_str not in self.shards:
+                guild_ids.add(int(guild_id_str))
+        return guild_ids
+
+    def is_banned(self, guild_id: int, user_id: int) -> bool:
+        return user_id in self.shard(guild_id).bans
+
+    def save_banned_user(self, guild_id: int, user_id: int, username: str, banned_by: str) -> None:
+        self.record_change(guild_id, ["b", user_id, username, banned_by, int(time.time())])
+
+    def save_banned_users(self, guild_id: int, users: list[tuple[int, str]], banned_by: str) -> None:
+        banned_at = int(time.time())
+        self.record_changes(guild_id, [["b", user_id, username, banned_by, banned_at] for user_id, username in users])
+
+    def remove_banned_user(self, guild_id: int, user_id: int) -> bool:
+        return self.record_change(guild_id, ["u", user_id])
+
+    def remove_banned_users(self, guild_id: int, user_ids: list[int]) -> int:
+        return self.record_changes(guild_id, [["u", user_id] for user_id in user_ids])
+
+    def get_logged_checkpoints(self, guild_id: int) -> list[int]:
+        return self.shard(guild_id).logged_checkpoints
+
+    def add_logged_checkpoint(self, guild_id: int, checkpoint: int) -> bool:
+        return self.record_change(guild_id, ["c", checkpoint])
+
+    def reset_guild(self, guild_id: int) -> bool:
+        guild_id_str = str(guild_id)
+        guild = self.shards.get(guild_id_str)
+        if guild is not None:
+            had_data = not guild.is_empty()
+        else:
+            had_data = os.path.exists(self.snapshot_path(guild_id_str)) or os.path.exists(self.journal_path(guild_id_str))
+
+        # Resetting a server is just dropping its shard, no other server's data is read or rewritten.
+        # The empty shard stays in memory so files still waiting to be deleted are never read back.
+        self.shards[guild_id_str] = GuildBans()
+        self.journal_entries[guild_id_str] = 0
+        self.pending_lines.pop(guild_id_str, None)
+        self.pending_snapshots.discard(guild_id_str)
+        self.pending_deletes.add(guild_id_str)
+        self.schedule_write()
+        return had_data
+
+    def get_unban_jobs(self) -> dict[int, dict]:
+        return {int(guild_id_str): job for guild_id_str, job in self.unban_jobs.items()}
+
+    def save_unban_job(self, guild_id: int, job: dict) -> None:
+        self.unban_jobs[str(guild_id)] = job
+        self.pending_jobs.add(str(guild_id))
+        self.schedule_write()
+
+    def delete_unban_job(self, guild_id: int) -> None:
+        if self.unban_jobs.pop(str(guild_id), None) is not None:
+            self.pending_jobs.add(str(guild_id))
+            self.schedule_write()
+
+
+class SqliteGuild:
+    """One server's tracked ban IDs and logged checkpoints, cached from the database"""
+    __slots__ = ('banned', 'checkpoints')
+
+    def __init__(self, banned: set[int], checkpoints: list[int]):
+        self.banned = banned
+        self.checkpoints = checkpoints
+
+
+class SqliteBanStore(BanStore):
+    """Ban store backed by SQLite in WAL mode. Reads come from a per-server cache loaded once, changes update the
+    cache and are written by a background thread, so neither waits on the database lock on the event loop"""
+
+    def __init__(self, path: str, legacy_path: str = None, flush_delay: float = 0.25):
+        self.path = path
+        self.flush_delay = flush_delay
+        # Autocommit, batches open their own transaction. Clustered workers share the database, so wait out
+        # another process's write instead of failing with "database is locked"
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Durable at WAL checkpoints rather than every commit, the usual pairing with WAL
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # The connection is shared by the writer thread, load() threads and inline reads
+        self.db_lock = threading.Lock()
+        self.create_schema()
+        self.guilds = {}  # {guild_id: SqliteGuild}, loaded lazily
+        self.pending = []  # (sql, rows) statements waiting for the writer, in order
+        self.writer_task = None
+        self.wakeup = None
+        self.write_lock = None
+        if legacy_path:
+            self.migrate_legacy_file(legacy_path)
+        self.unban_jobs = {
+            guild_id: json.loads(job) for guild_id, job in self.conn.execute("SELECT guild_id, job FROM unban_jobs")
+        }
+
+    def create_schema(self) -> None:
+        with self.conn:
+            self.conn.execute("BEGIN")
+            # (guild_id, user_id) primary key doubles as the index behind the per-server COUNT(*)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS banned_users (
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    username TEXT NOT NULL,
+                    banned_by TEXT NOT NULL,
+                    banned_at INTEGER NOT NULL,
+                    PRIMARY KEY (guild_id, user_id)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS logged_checkpoints (
+                    guild_id INTEGER NOT NULL,
+                    checkpoint INTEGER NOT NULL,
+                    PRIMARY KEY (guild_id, checkpoint)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS unban_jobs (
+                    guild_id INTEGER PRIMARY KEY,
+                    job TEXT NOT NULL
+                )
+            """)
+
+    def migrate_legacy_file(self, legacy_path: str) -> None:
+        """Import the original multi-server tracking file, so switching to SQLite keeps the current tracking"""
+        try:
+            with open(legacy_path, 'r') as f:
+                all_data = json.load(f)
+        except FileNotFoundError:
+            return
+
+        bans = []
+        checkpoints = []
+        for guild_id_str, guild_data in all_data.items():
+            guild = GuildBans.from_json(guild_data)
+            guild_id = int(guild_id_str)
+            for user_id, record in guild.bans.items():
+                bans.append((guild_id, user_id, guild.names[record.username_id], guild.names[record.banned_by_id],
+                             record.banned_at))
+            checkpoints.extend((guild_id, checkpoint) for checkpoint in guild.logged_checkpoints)
+
+        self.execute_batch([
+            ("INSERT OR IGNORE INTO banned_users (guild_id, user_id, username, banned_by, banned_at) VALUES (?, ?, ?, ?, ?)", bans),
+            ("INSERT OR IGNORE INTO logged_checkpoints (guild_id, checkpoint) VALUES (?, ?)", checkpoints)
+        ])
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+        print(f"📦 [CONSOLE] Migrated {legacy_path} into {self.path} ({len(bans)} bans in {len(all_data)} servers)")
+
+    def read_guild(self, guild_id: int) -> SqliteGuild:
+        with self.db_lock:
+            banned = {user_id for (user_id,) in self.conn.execute(
+                "SELECT user_id FROM banned_users WHERE guild_id = ?", (guild_id,)
+            )}
+            checkpoints = [checkpoint for (checkpoint,) in self.conn.execute(
+                "SELECT checkpoint FROM logged_checkpoints WHERE guild_id = ? ORDER BY checkpoint", (guild_id,)
+            )]
+        return SqliteGuild(banned, checkpoints)
+
+    def guild(self, guild_id: int) -> SqliteGuild:
+        """Get a server's cached data, reading it inline if load() didn't already"""
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = self.read_guild(guild_id)
+        return guild
+
+    async def load(self, guild_id: int) -> None:
+        if guild_id in self.guilds:
+            return
+        guild = await asyncio.to_thread(self.read_guild, guild_id)
+        # Changes are only recorded on loaded servers, so nothing can be pending that this read missed
+        self.guilds.setdefault(guild_id, guild)
+
+    def execute_batch(self, statements: list[tuple[str, list]]) -> None:
+        """Run statements in one transaction, in the writer thread (or inline without one)"""
+        with self.db_lock, self.conn:
+            self.conn.execute("BEGIN")
+            for sql, rows in statements:
+                self.conn.executemany(sql, rows)
+
+    def queue(self, sql: str, rows: list) -> None:
+        if rows:
+            self.pending.append((sql, rows))
+            self.schedule_write()
+
+    async def start(self) -> None:
+        self.wakeup = asyncio.Event()
+        self.write_lock = asyncio.Lock()
+        self.writer_task = asyncio.create_task(self.writer_loop())
+
+    def schedule_write(self) -> None:
+        """Wake the background writer, or write inline when it isn't running (scripts, tests)"""
+        if self.writer_task is None:
+            statements, self.pending = self.pending, []
+            self.execute_batch(statements)
+            return
+        self.wakeup.set()
+
+    async def writer_loop(self) -> None:
+        """Background writer: every change landing within flush_delay goes into one transaction"""
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(self.flush_delay)
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self.write_lock is None:
+            return
+        async with self.write_lock:
+            if not self.pending:
+                return
+            statements, self.pending = self.pending, []
+            try:
+                await asyncio.to_thread(self.execute_batch, statements)
+            except sqlite3.Error as e:
+                # The transaction rolled back and every statement is idempotent, run them again ahead of newer ones
+                self.pending = statements + self.pending
+                print(f"❌ [CONSOLE] Failed to write ban store, will retry: {e}")
+                self.wakeup.set()
+
+    def close(self) -> None:
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            self.writer_task = None
+        if self.pending:
+            statements, self.pending = self.pending, []
+            self.execute_batch(statements)
+        self.conn.close()
+
+    def get_banned_user_ids(self, guild_id: int) -> list[int]:
+        return list(self.guild(guild_id).banned)
+
+    def get_banned_count(self, guild_id: int) -> int:
+        return len(self.guild(guild_id).banned)
+
+    def get_tracked_guild_ids(self) -> set[int]:
+        with self.db_lock:
+            guild_ids = {guild_id for (guild_id,) in self.conn.execute("SELECT DISTINCT guild_id FROM banned_users")}
+        # Loaded servers may have changes the writer hasn't stored yet
+        for guild_id, guild in self.guilds.items():
+            if guild.banned:
+                guild_ids.add(guild_id)
+            else:
+                guild_ids.discard(guild_id)
+        return guild_ids
+
+    def is_banned(self, guild_id: int, user_id: int) -> bool:
+        return user_id in self.guild(guild_id).banned
+
+    def save_banned_user(self, guild_id: int, user_id: int, username: str, banned_by: str) -> None:
+        self.save_banned_users(guild_id, [(user_id, username)], banned_by)
+
+    def save_banned_users(self, guild_id: int, users: list[tuple[int, str]], banned_by: str) -> None:
+        banned_at = int(time.time())
+        self.guild(guild_id).banned.update(user_id for user_id, _ in users)
+        self.queue(
+            "INSERT OR REPLACE INTO banned_users (guild_id, user_id, username, banned_by, banned_at) VALUES (?, ?, ?, ?, ?)",
+            [(guild_id, user_id, username, banned_by, banned_at) for user_id, username in users]
+        )
+
+    def remove_banned_user(self, guild_id: int, user_id: int) -> bool:
+        return self.remove_banned_users(guild_id, [user_id]) > 0
+
+    def remove_banned_users(self, guild_id: int, user_ids: list[int]) -> int:
+        banned = self.guild(guild_id).banned
+        removed = [user_id for user_id in dict.fromkeys(user_ids) if user_id in banned]
+        banned.difference_update(removed)
+        self.queue(
+            "DELETE FROM banned_users WHERE guild_id = ? AND user_id = ?", [(guild_id, user_id) for user_id in removed]
+        )
+        return len(removed)
+
+    def get_logged_checkpoints(self, guild_id: int) -> list[int]:
+        return self.guild(guild_id).checkpoints
+
+    def add_logged_checkpoint(self, guild_id: int, checkpoint: int) -> bool:
+        guild = self.guild(guild_id)
+        if checkpoint in guild.checkpoints:
+            return False
+        guild.checkpoints = sorted(guild.checkpoints + [checkpoint])
+        self.queue("INSERT OR IGNORE INTO logged_checkpoints (guild_id, checkpoint) VALUES (?, ?)", [(guild_id, checkpoint)])
+        return True
+
+    def reset_guild(self, guild_id: int) -> bool:
+        guild = self.guild(guild_id)
+        had_data = bool(guild.banned or guild.checkpoints)
+        self.guilds[guild_id] = SqliteGuild(set(), [])
+        self.queue("DELETE FROM banned_users WHERE guild_id = ?", [(guild_id,)])
+        self.queue("DELETE FROM logged_checkpoints WHERE guild_id = ?", [(guild_id,)])
+        return had_data
+
+    def get_unban_jobs(self) -> dict[int, dict]:
+        return dict(self.unban_jobs)
+
+    def save_unban_job(self, guild_id: int, job: dict) -> None:
+        self.unban_jobs[guild_id] = job
+        self.queue("INSERT OR REPLACE INTO unban_jobs (guild_id, job) VALUES (?, ?)", [(guild_id, json.dumps(job))])
+
+    def delete_unban_job(self, guild_id: int) -> None:
+        if self.unban_jobs.pop(guild_id, None) is not None:
+            self.queue("DELETE FROM unban_jobs WHERE guild_id = ?", [(guild_id,)])
+
+
+def create_store(config: dict) -> BanStore:
+    """Create the ban store selected by the storage_backend setting"""
+    backend = config['storage_backend']
+    if backend == 'json':
+        return JsonBanStore(
+            config['data_dir'],
+            journal_mode=config['journal_mode'],
+            journal_compact_entries=config['journal_compact_entries'],
+            legacy_path=config['legacy_file'] or None,
+            flush_delay=config['flush_delay']
+        )
+    if backend == 'sqlite':
+        return SqliteBanStore(
+            config['sqlite_path'],
+            legacy_path=config['legacy_file'] or None,
+            flush_delay=config['flush_delay']
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected 'json' or 'sqlite')")
@@ -0,0 +1,15 @@
+from game_state import GameState
+
+
+def test_streaks_follow_rolls_not_applied_bans():
+    game = GameState(1)
+    # Hit, miss, hit: the first hit's ban is only applied after the miss
+    game.record_hit(7)
+    game.record_miss(7)
+    game.record_hit(7)
+    assert game.record_ban(7) == 1
+    assert game.record_ban(7) == 2
+
+    assert game.streaks[7] == 1
+    assert game.best_streaks.get(7) == 1
+    assert game.ban_counts.get(7) == 2
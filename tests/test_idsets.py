@@ -0,0 +1,44 @@
+from idsets import IdSet
+
+BIG = 1400583337176862732  # a real snowflake, needs all 64 bits of the array
+
+
+def test_ids_are_sorted_and_deduplicated():
+    ids = IdSet([5, 3, BIG, 3])
+    assert list(ids) == [3, 5, BIG]
+    assert len(ids) == 3
+    assert BIG in ids
+    assert 4 not in ids
+
+
+def test_add_and_discard():
+    ids = IdSet([1, 3])
+    assert ids.add(2)
+    assert not ids.add(2)
+    assert list(ids) == [1, 2, 3]
+    assert ids.discard(1)
+    assert not ids.discard(1)
+    assert list(ids) == [2, 3]
+
+
+def test_update():
+    ids = IdSet([1, 5])
+    ids.update([5, 3, 3, 9])
+    assert list(ids) == [1, 3, 5, 9]
+
+
+def test_difference():
+    left = IdSet([1, 2, 3, 4, 10])
+    right = IdSet([0, 2, 4, 5, 11])
+    assert list(left - right) == [1, 3, 10]
+    assert list(left.difference(IdSet())) == list(left)
+    assert list(IdSet() - left) == []
+
+
+def test_copy_is_independent():
+    ids = IdSet([1, 2])
+    copy = ids.copy()
+    copy.add(3)
+    ids.discard(1)
+    assert list(ids) == [2]
+    assert list(copy) == [1, 2, 3]
@@ -0,0 +1,50 @@
+import random
+
+from leaderboard import Leaderboard
+
+
+def test_top_orders_by_score_then_who_got_there_first():
+    board = Leaderboard()
+    for user_id in [1, 2, 2, 3, 3, 1]:
+        board.increment(user_id)
+
+    # 2 and 3 reached 2 before 1 did, ties share a rank
+    assert board.top(10) == [(1, 2, 2), (1, 3, 2), (1, 1, 2)]
+    board.increment(1)
+    assert board.top(2) == [(1, 1, 3), (2, 2, 2)]
+
+
+def test_rank():
+    board = Leaderboard()
+    for user_id in [1, 1, 1, 2, 3, 3]:
+        board.increment(user_id)
+
+    assert board.rank(1) == 1
+    assert board.rank(3) == 2
+    assert board.rank(2) == 3
+    assert board.rank(4) is None
+
+
+def test_matches_a_full_sort():
+    rng = random.Random(7)
+    board = Leaderboard()
+    scores = {}
+    for _ in range(2000):
+        user_id = rng.randrange(50)
+        scores[user_id] = board.increment(user_id)
+
+    assert len(board) == len(scores)
+    for user_id, score in scores.items():
+        assert board.get(user_id) == score
+        assert board.rank(user_id) == 1 + sum(1 for other in scores.values() if other > score)
+    expected = sorted(scores.values(), reverse=True)[:10]
+    assert [score for _, _, score in board.top(10)] == expected
+
+
+def test_clear():
+    board = Leaderboard()
+    board.increment(1)
+    board.clear()
+    assert len(board) == 0
+    assert board.top(5) == []
+    assert board.rank(1) is None
@@ -0,0 +1,67 @@
+import pytest
+
+import ratelimit
+from ratelimit import SlidingWindowLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, 'monotonic', clock)
+    return clock
+
+
+def test_burst_then_one_notified_rejection(clock):
+    limiter = SlidingWindowLimiter(burst=3, refill_rate=1)  # 3 hits per 3 seconds
+    assert [limiter.check(1) for _ in range(3)] == [(True, False)] * 3
+    assert limiter.check(1) == (False, True)
+    assert limiter.check(1) == (False, False)
+    assert limiter.check(2) == (True, False)  # keys are independent
+
+
+def test_window_slides_instead_of_resetting(clock):
+    limiter = SlidingWindowLimiter(burst=2, refill_rate=1)  # 2 hits per 2 seconds
+    limiter.check(1)
+    clock.now += 1.5
+    limiter.check(1)
+    assert limiter.check(1) == (False, True)
+
+    # Only the first hit has left the window
+    clock.now += 0.5
+    assert limiter.check(1) == (True, False)
+    assert limiter.check(1) == (False, True)  # a new limited window is notified again
+
+
+def test_rejected_hits_do_not_extend_the_window(clock):
+    limiter = SlidingWindowLimiter(burst=1, refill_rate=1)
+    limiter.check(1)
+    for _ in range(5):
+        clock.now += 0.1
+        limiter.check(1)
+    clock.now = 1001.0
+    assert limiter.check(1) == (True, False)
+
+
+def test_disabled_limits_nothing(clock):
+    for limiter in (SlidingWindowLimiter(burst=0, refill_rate=1), SlidingWindowLimiter(burst=3, refill_rate=0)):
+        assert all(limiter.check(1) == (True, False) for _ in range(10))
+
+
+def test_idle_keys_are_pruned(clock):
+    limiter = SlidingWindowLimiter(burst=1, refill_rate=1)
+    limiter.check('idle')
+    limiter.check('idle')
+    clock.now += 2
+    for _ in range(999):
+        limiter.check('busy')
+    assert 'idle' not in limiter.hits
+    assert 'idle' not in limiter.notified
+    assert 'busy' in limiter.hits
@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("discord")
+
+import retry
+from retry import CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, 'monotonic', clock)
+    return clock
+
+
+def open_breaker(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    assert not breaker.failed()
+    assert breaker.failed()
+    return breaker
+
+
+def test_opens_after_threshold_server_errors_in_a_row(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.failed()
+    breaker.succeeded()
+    assert not breaker.failed()  # the success reset the count
+    assert breaker.failed()
+    with pytest.raises(CircuitOpen) as raised:
+        breaker.check()
+    assert raised.value.retry_in == 30
+
+
+def test_half_open_lets_exactly_one_probe_through(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    breaker.check()  # the probe
+    for _ in range(3):
+        with pytest.raises(CircuitOpen) as raised:
+            breaker.check()
+        assert raised.value.retry_in == CircuitBreaker.PROBE_POLL
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    breaker.check()
+    breaker.succeeded()
+    breaker.check()
+    breaker.check()
+    assert breaker.opened_at is None
+    assert not breaker.failed()  # counting starts over
+
+
+def test_failed_probe_reopens_for_a_full_cooldown(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    breaker.check()
+    assert breaker.failed()
+    clock.now += 29
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+    clock.now += 1
+    breaker.check()  # the next probe
+
+
+def test_lost_probe_is_replaced_after_a_cooldown(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    breaker.check()  # this probe never reports back
+    clock.now += 29
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+
+
+def test_errors_of_calls_already_in_flight_do_not_extend_the_cooldown(clock):
+    breaker = open_breaker(clock)
+    clock.now += 10
+    assert not breaker.failed()
+    clock.now += 20
+    breaker.check()
+
+
+def test_zero_threshold_never_opens(clock):
+    breaker = CircuitBreaker(threshold=0, cooldown=30)
+    assert not any(breaker.failed() for _ in range(10))
+    breaker.check()
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from storage import BanStore, GuildBans, JsonBanStore, SqliteBanStore
+
+
+def open_store(backend: str, path):
+    if backend == 'sqlite':
+        return SqliteBanStore(str(path / "bans.db"))
+    return JsonBanStore(str(path / "bans"), journal_mode=backend == 'json-journal')
+
+
+BACKENDS = ['json-journal', 'json-snapshot', 'sqlite']
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+def test_ban_store_is_abstract():
+    with pytest.raises(TypeError):
+        BanStore()
+
+
+def test_bans_are_tracked_per_server(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_banned_user(1, 100, "alice", "mod")
+    store.save_banned_users(1, [(101, "bob"), (102, "carol")], "mod")
+    store.save_banned_user(2, 100, "alice", "other mod")
+
+    assert sorted(store.get_banned_user_ids(1)) == [100, 101, 102]
+    assert store.get_banned_count(1) == 3
+    assert store.get_banned_count(2) == 1
+    assert store.is_banned(1, 101)
+    assert not store.is_banned(2, 101)
+    assert store.get_banned_count(3) == 0
+
+
+def test_tracked_servers_are_listed_without_loading_them(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_banned_user(1, 100, "alice", "mod")
+    store.save_banned_user(2, 200, "bob", "mod")
+    store.reset_guild(2)
+    store.close()
+
+    store = open_store(backend, tmp_path)
+    assert store.get_tracked_guild_ids() == {1}
+    if backend != 'sqlite':
+        assert store.shards == {}
+
+
+def test_removals_report_what_was_tracked(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_banned_users(1, [(100, "alice"), (101, "bob"), (102, "carol")], "mod")
+
+    assert store.remove_banned_user(1, 100)
+    assert not store.remove_banned_user(1, 100)
+    assert store.remove_banned_users(1, [101, 999]) == 1
+    assert store.get_banned_user_ids(1) == [102]
+
+
+def test_checkpoints_are_logged_once(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    assert store.add_logged_checkpoint(1, 50)
+    assert store.add_logged_checkpoint(1, 25)
+    assert not store.add_logged_checkpoint(1, 50)
+    assert store.get_logged_checkpoints(1) == [25, 50]
+    assert store.get_logged_checkpoints(2) == []
+
+
+def test_reset_only_touches_one_server(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_banned_user(1, 100, "alice", "mod")
+    store.add_logged_checkpoint(1, 50)
+    store.save_banned_user(2, 200, "dave", "mod")
+
+    assert store.reset_guild(1)
+    assert not store.reset_guild(1)
+    assert store.get_banned_count(1) == 0
+    assert store.get_logged_checkpoints(1) == []
+    assert store.get_banned_user_ids(2) == [200]
+
+
+def test_unban_jobs(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_unban_job(1, {"processed": 1})
+    store.save_unban_job(2, {"processed": 2})
+    store.save_unban_job(1, {"processed": 3})
+    store.delete_unban_job(2)
+    assert store.get_unban_jobs() == {1: {"processed": 3}}
+
+
+def test_everything_survives_a_restart(backend, tmp_path):
+    store = open_store(backend, tmp_path)
+    store.save_banned_users(1, [(100, "alice"), (101, "bob")], "mod")
+    store.remove_banned_user(1, 100)
+    store.add_logged_checkpoint(1, 75)
+    store.save_unban_job(1, {"processed": 4})
+    store.close()
+
+    store = open_store(backend, tmp_path)
+    assert store.get_banned_user_ids(1) == [101]
+    assert store.get_logged_checkpoints(1) == [75]
+    assert store.get_unban_jobs() == {1: {"processed": 4}}
+
+
+def test_journal_is_replayed_over_the_snapshot(tmp_path):
+    store = JsonBanStore(str(tmp_path))
+    store.save_banned_users(1, [(100, "alice"), (101, "bob")], "mod")
+    store.remove_banned_user(1, 100)
+    store.add_logged_checkpoint(1, 50)
+    # No close(): the snapshot was never written, everything is in the journal
+    assert not os.path.exists(store.snapshot_path("1"))
+
+    reopened = JsonBanStore(str(tmp_path))
+    assert reopened.get_banned_user_ids(1) == [101]
+    assert reopened.get_logged_checkpoints(1) == [50]
+    assert reopened.journal_entries["1"] == 4
+
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    store = JsonBanStore(str(tmp_path))
+    store.save_banned_user(1, 100, "alice", "mod")
+    with open(store.journal_path("1"), 'a') as f:
+        f.write('["b", 101, "bo')
+
+    assert JsonBanStore(str(tmp_path)).get_banned_user_ids(1) == [100]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    store = JsonBanStore(str(tmp_path))
+    store.save_banned_users(1, [(100, "alice"), (101, "bob")], "mod")
+    store.remove_banned_user(1, 100)
+    store.compact()
+
+    assert os.path.getsize(store.journal_path("1")) == 0
+    assert store.journal_entries["1"] == 0
+    with open(store.snapshot_path("1")) as f:
+        assert sorted(GuildBans.from_json(json.load(f)).bans) == [101]
+    assert JsonBanStore(str(tmp_path)).get_banned_user_ids(1) == [101]
+
+
+def test_long_journal_is_compacted_automatically(tmp_path):
+    store = JsonBanStore(str(tmp_path), journal_compact_entries=3)
+    store.save_banned_users(1, [(100, "alice"), (101, "bob"), (102, "carol")], "mod")
+
+    assert os.path.exists(store.snapshot_path("1"))
+    assert os.path.getsize(store.journal_path("1")) == 0
+
+
+def test_legacy_file_is_split_into_shards(tmp_path):
+    legacy_path = tmp_path / "event_banned_users.json"
+    legacy_path.write_text(json.dumps({
+        "1": {
+            "100": {"username": "alice", "banned_by": "mod", "banned_at": "2024-05-01T12:00:00"},
+            "_logged_checkpoints": [50]
+        },
+        "2": {}
+    }))
+
+    store = JsonBanStore(str(tmp_path / "bans"), legacy_path=str(legacy_path))
+    assert not legacy_path.exists()
+    assert (tmp_path / "event_banned_users.json.migrated").exists()
+    assert store.get_banned_user_ids(1) == [100]
+    assert store.get_logged_checkpoints(1) == [50]
+    assert not os.path.exists(store.snapshot_path("2"))
+
+    # Migrated servers take journal writes right away, and survive a restart
+    store.save_banned_user(1, 101, "bob", "mod")
+    reopened = JsonBanStore(str(tmp_path / "bans"))
+    assert sorted(reopened.get_banned_user_ids(1)) == [100, 101]
+
+
+def test_load_reads_a_server_in_a_thread(tmp_path):
+    store = JsonBanStore(str(tmp_path))
+    store.save_banned_users(1, [(100, "alice"), (101, "bob")], "mod")
+
+    reopened = JsonBanStore(str(tmp_path))
+    asyncio.run(reopened.load(1))
+    assert "1" in reopened.shards
+    assert reopened.journal_entries["1"] == 2
+    assert sorted(reopened.get_banned_user_ids(1)) == [100, 101]
+
+
+def test_legacy_file_is_imported_into_sqlite(tmp_path):
+    legacy_path = tmp_path / "event_banned_users.json"
+    legacy_path.write_text(json.dumps({
+        "1": {
+            "100": {"username": "alice", "banned_by": "mod", "banned_at": "2024-05-01T12:00:00"},
+            "_logged_checkpoints": [50]
+        },
+        "2": {}
+    }))
+
+    store = SqliteBanStore(str(tmp_path / "bans.db"), legacy_path=str(legacy_path))
+    assert not legacy_path.exists()
+    assert (tmp_path / "event_banned_users.json.migrated").exists()
+    assert store.get_banned_user_ids(1) == [100]
+    assert store.get_logged_checkpoints(1) == [50]
+    assert store.get_tracked_guild_ids() == {1}
+    store.close()
+
+
+def test_sqlite_writes_happen_in_the_background(tmp_path):
+    async def run():
+        store = SqliteBanStore(str(tmp_path / "bans.db"), flush_delay=60)
+        await store.start()
+        store.save_banned_users(1, [(100, "alice"), (101, "bob")], "mod")
+        store.add_logged_checkpoint(1, 50)
+        assert sorted(store.get_banned_user_ids(1)) == [100, 101]
+        assert store.get_tracked_guild_ids() == {1}
+
+        # Nothing reached the database yet, the writer is still waiting out the delay
+        other = SqliteBanStore(str(tmp_path / "bans.db"))
+        assert other.get_banned_count(1) == 0
+        other.close()
+
+        await store.flush()
+        assert store.pending == []
+        store.close()
+
+    asyncio.run(run())
+    reopened = SqliteBanStore(str(tmp_path / "bans.db"))
+    asyncio.run(reopened.load(1))
+    assert sorted(reopened.get_banned_user_ids(1)) == [100, 101]
+    assert reopened.get_logged_checkpoints(1) == [50]
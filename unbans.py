@@ -0,0 +1,201 @@
+import asyncio
+import time
+
+import discord
+
+from retry import CircuitOpen, RetryPolicy, is_rate_limit
+
+
+class UnbanJob:
+    """Persisted state of a mass unban: what it is for and how far it got, so it can continue after a restart.
+    Users still tracked as banned (minus failed_ids) are the work that is left"""
+    __slots__ = ('kind', 'reason', 'requested_by', 'channel_id', 'total', 'processed', 'unbanned', 'failed',
+                 'failed_ids', 'started_at')
+
+    def __init__(self, kind: str, reason: str, requested_by: str, channel_id: int, total: int):
+        self.kind = kind  # 'endgame' also resets the game state once done, 'unbanall' only unbans
+        self.reason = reason
+        self.requested_by = requested_by
+        self.channel_id = channel_id
+        self.total = total
+        self.processed = 0
+        self.unbanned = 0
+        self.failed = 0
+        self.failed_ids = []  # not retried on resume
+        self.started_at = time.time()
+
+    def to_json(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'UnbanJob':
+        job = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(job, name, data[name])
+        return job
+
+
+class UnbanRun:
+    """One mass unban: a queue of user IDs worked off by a pool whose size adapts to rate limiting"""
+
+    # discord.py sleeps through 429s inside the request, so a rate limit shows up as a request taking this much
+    # longer than usual (and at least SLOW_REQUEST seconds)
+    SLOW_FACTOR = 3.0
+    SLOW_REQUEST = 1.0
+
+    def __init__(self, guild: discord.Guild, user_ids: list[int], reason: str,
+                 max_concurrency: int, api: RetryPolicy, on_result=None, on_progress=None):
+        self.guild = guild
+        self.reason = reason
+        self.total = len(user_ids)
+        self.queue = asyncio.Queue()
+        for user_id in user_ids:
+            self.queue.put_nowait(user_id)
+        self.max_concurrency = max(1, max_concurrency)
+        self.api = api
+        self.on_result = on_result  # (user_id, unbanned) -> None, called for every finished user
+        self.on_progress = on_progress  # async (run) -> None, called after every finished user
+
+        # Additive increase / multiplicative decrease on the number of requests in flight
+        self.limit = min(2, self.max_concurrency)
+        self.in_flight = 0
+        self.successes_at_limit = 0
+        self.resume_at = 0.0  # monotonic time before which nobody sends (set from retry_after)
+        self.latency = None  # moving average of how long an unban request takes, seconds
+        self.slots = asyncio.Condition()
+
+        self.processed = 0
+        self.unbanned = 0
+        self.failed = 0
+        self.rate_limits = 0
+        self.started_at = time.monotonic()
+
+    async def run(self) -> tuple[int, int]:
+        workers = [asyncio.create_task(self.worker()) for _ in range(min(self.max_concurrency, self.total))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return self.unbanned, self.failed
+
+    async def worker(self) -> None:
+        while True:
+            try:
+                user_id = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                unbanned = await self.unban(user_id)
+            except CircuitOpen as e:
+                # Discord is down, which says nothing about this user: put them back and wait out the breaker
+                self.queue.put_nowait(user_id)
+                await asyncio.sleep(e.retry_in)
+                continue
+            self.processed += 1
+            if unbanned:
+                self.unbanned += 1
+            else:
+                self.failed += 1
+            if self.on_result is not None:
+                self.on_result(user_id, unbanned)
+            if self.on_progress is not None:
+                await self.on_progress(self)
+
+    async def acquire(self) -> None:
+        async with self.slots:
+            await self.slots.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self) -> None:
+        async with self.slots:
+            self.in_flight -= 1
+            self.slots.notify_all()
+
+    def succeeded(self) -> None:
+        # One more request in flight after a full window of clean requests at the current limit
+        self.successes_at_limit += 1
+        if self.successes_at_limit >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self.successes_at_limit = 0
+
+    def shrink(self) -> None:
+        self.rate_limits += 1
+        self.limit = max(1, self.limit // 2)
+        self.successes_at_limit = 0
+
+    def observe(self, duration: float) -> None:
+        """Time one request took: far slower than the average means the library waited out a rate limit"""
+        if self.latency is not None and duration > max(self.SLOW_REQUEST, self.SLOW_FACTOR * self.latency):
+            self.shrink()  # the wait itself already happened inside the request
+            return
+        self.latency = duration if self.latency is None else 0.8 * self.latency + 0.2 * duration
+
+    def throttled(self, error: discord.HTTPException, retry_after: float) -> None:
+        # Only reached for waits longer than the client's max_ratelimit_timeout, raised as RateLimited
+        if not is_rate_limit(error):
+            return
+        self.shrink()
+        self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+
+    async def unban(self, user_id: int) -> bool:
+        """Unban one user by ID, returns whether they are no longer banned (CircuitOpen is raised, the user
+        can be retried)"""
+        async def attempt():
+            await self.acquire()
+            started = time.monotonic()
+            try:
+                # No fetch_ban first: unbanning someone who isn't banned is just a NotFound
+                await self.guild.unban(discord.Object(id=user_id), reason=self.reason)
+            finally:
+                self.observe(time.monotonic() - started)
+                await self.release()
+
+        try:
+            # Retries go through the shared policy, rate limits also shrink the pool via observe()/throttled()
+            await self.api.call('unban', attempt, on_retry=self.throttled)
+        except discord.NotFound:
+            pass  # Not banned (any more), which is what we wanted
+        except (discord.RateLimited, discord.HTTPException):
+            return False
+        self.succeeded()
+        return True
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+class UnbanEngine:
+    """Shared mass unban implementation used by !unbanall and !endgame"""
+
+    def __init__(self, api: RetryPolicy, max_concurrency: int = 8):
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self.runs = {}  # {guild_id: UnbanRun in progress}, for status reporting
+
+    async def unban_all(self, guild: discord.Guild, user_ids: list[int], reason: str,
+                        on_result=None, on_progress=None) -> tuple[int, int]:
+        """Unban every user ID, returns (unbanned, failed)"""
+        run = UnbanRun(guild, user_ids, reason, self.max_concurrency, self.api, on_result, on_progress)
+        self.runs[guild.id] = run
+        try:
+            return await run.run()
+        finally:
+            if self.runs.get(guild.id) is run:
+                del self.runs[guild.id]
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"